@@ -0,0 +1,42 @@
+"""incident keyset pagination indexes
+
+Revision ID: 3b8c1f2a9d41
+Revises: e4f245aa3234
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8c1f2a9d41'
+down_revision: Union[str, Sequence[str], None] = 'e4f245aa3234'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_incidents_created_at_id': ['created_at', 'id'],
+    'ix_incidents_client_id_created_at_id': ['client_id', 'created_at', 'id'],
+    'ix_incidents_status_created_at_id': ['status', 'created_at', 'id'],
+    'ix_incidents_priority_created_at_id': ['priority', 'created_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY — чтобы не блокировать запись в большую таблицу incidents
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'incidents', columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='incidents',
+                          postgresql_concurrently=True, if_exists=True)
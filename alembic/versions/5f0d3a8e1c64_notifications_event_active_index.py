@@ -0,0 +1,32 @@
+"""notifications (event, is_active) index
+
+Revision ID: 5f0d3a8e1c64
+Revises: c4e81b7d5f22
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0d3a8e1c64'
+down_revision: Union[str, Sequence[str], None] = 'c4e81b7d5f22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notifications_event_is_active', 'notifications', ['event', 'is_active'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notifications_event_is_active', table_name='notifications',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,54 @@
+"""incident daily stats rollup
+
+Revision ID: 7d2e4a9c0b13
+Revises: 3b8c1f2a9d41
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4a9c0b13'
+down_revision: Union[str, Sequence[str], None] = '3b8c1f2a9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('incident_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('incidents', sa.Integer(), nullable=False),
+    sa.Column('response_minutes', sa.Float(), nullable=False),
+    sa.Column('responded', sa.Integer(), nullable=False),
+    sa.Column('resolution_minutes', sa.Float(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'client_id', 'priority', 'status')
+    )
+    # первичное заполнение из incidents
+    op.execute("""
+        INSERT INTO incident_daily_stats
+            (day, client_id, priority, status, incidents,
+             response_minutes, responded, resolution_minutes, resolved)
+        SELECT CAST(timezone('UTC', created_at) AS DATE),
+               coalesce(client_id, 0), coalesce(priority, ''), coalesce(status, ''),
+               count(*),
+               coalesce(sum(extract(epoch FROM first_response_at - created_at) / 60), 0),
+               count(first_response_at),
+               coalesce(sum(extract(epoch FROM closed_at - created_at) / 60), 0),
+               count(closed_at)
+        FROM incidents
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('incident_daily_stats')
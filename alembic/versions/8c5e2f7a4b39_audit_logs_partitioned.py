@@ -0,0 +1,96 @@
+"""audit_logs partitioned by month
+
+Revision ID: 8c5e2f7a4b39
+Revises: f2a6d8c3b915
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5e2f7a4b39'
+down_revision: Union[str, Sequence[str], None] = 'f2a6d8c3b915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "user_id, path, method, status_code, timestamp, user_agent, ip, error"
+# секции на текущий месяц и столько следующих; дальше их создаёт приложение
+MONTHS_AHEAD = 2
+
+
+# копия хелперов app/services/audit_partitions.py на момент миграции —
+# миграция не должна зависеть от изменяемого кода приложения
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_partition_sql(month: date) -> str:
+    start, end = month_start(month), add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS audit_logs_y{start.year:04d}m{start.month:02d} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    kind = bind.execute(sa.text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_logs')"
+    )).scalar()
+    if kind == 'p':
+        # уже создана секционированной (init_db/create_all)
+        return
+
+    first_month = month_start(datetime.now(timezone.utc).date())
+    if kind == 'r':
+        # несекционированная таблица от create_all — переносим данные
+        op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_old")
+        op.execute("ALTER TABLE audit_logs_old RENAME CONSTRAINT audit_logs_pkey TO audit_logs_old_pkey")
+        oldest = bind.execute(sa.text("SELECT min(timestamp) FROM audit_logs_old")).scalar()
+        if oldest is not None:
+            first_month = min(first_month, month_start(oldest.astimezone(timezone.utc).date()))
+
+    op.create_table('audit_logs',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('method', sa.String(length=10), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('ip', sa.String(length=45), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id', 'timestamp'),
+    postgresql_partition_by='RANGE (timestamp)',
+    )
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_audit_logs_user_id_timestamp', 'audit_logs', ['user_id', 'timestamp'], unique=False)
+    op.create_index('ix_audit_logs_path_timestamp', 'audit_logs', ['path', 'timestamp'], unique=False)
+
+    last_month = add_months(month_start(datetime.now(timezone.utc).date()), MONTHS_AHEAD)
+    month = first_month
+    while month <= last_month:
+        op.execute(create_partition_sql(month))
+        month = add_months(month, 1)
+
+    if kind == 'r':
+        op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_old")
+        op.drop_table('audit_logs_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # секции удаляются вместе с родительской таблицей
+    op.drop_table('audit_logs')
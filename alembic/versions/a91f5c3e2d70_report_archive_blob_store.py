@@ -0,0 +1,36 @@
+"""report archive content in blob store
+
+Revision ID: a91f5c3e2d70
+Revises: 7d2e4a9c0b13
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91f5c3e2d70'
+down_revision: Union[str, Sequence[str], None] = '7d2e4a9c0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Сами файлы переносятся отдельно: python -m app.jobs.report_blob_migration
+    op.add_column('report_archive', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('report_archive', sa.Column('size', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_report_archive_content_sha256'), 'report_archive', ['content_sha256'], unique=False)
+    op.alter_column('report_archive', 'content', existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Перед даунгрейдом содержимое должно быть возвращено в content
+    op.alter_column('report_archive', 'content', existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_index(op.f('ix_report_archive_content_sha256'), table_name='report_archive')
+    op.drop_column('report_archive', 'size')
+    op.drop_column('report_archive', 'content_sha256')
@@ -0,0 +1,30 @@
+"""notification outbox per-subscription rows
+
+Revision ID: b6d1f4e8a2c7
+Revises: 8c5e2f7a4b39
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f4e8a2c7'
+down_revision: Union[str, Sequence[str], None] = '8c5e2f7a4b39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification_outbox', sa.Column('subscription_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # строки по подпискам нельзя вернуть в строки событий — они уже разложены
+    op.execute("DELETE FROM notification_outbox WHERE subscription_id IS NOT NULL")
+    op.drop_column('notification_outbox', 'subscription_id')
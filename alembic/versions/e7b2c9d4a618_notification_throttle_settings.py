@@ -0,0 +1,30 @@
+"""notification rate limit / digest settings
+
+Revision ID: e7b2c9d4a618
+Revises: 5f0d3a8e1c64
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c9d4a618'
+down_revision: Union[str, Sequence[str], None] = '5f0d3a8e1c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('rate_limit_per_minute', sa.Integer(), nullable=True))
+    op.add_column('notifications', sa.Column('digest_window_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notifications', 'digest_window_seconds')
+    op.drop_column('notifications', 'rate_limit_per_minute')
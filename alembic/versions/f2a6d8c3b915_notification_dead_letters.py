@@ -0,0 +1,42 @@
+"""notification dead letters
+
+Revision ID: f2a6d8c3b915
+Revises: e7b2c9d4a618
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6d8c3b915'
+down_revision: Union[str, Sequence[str], None] = 'e7b2c9d4a618'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_dead_letters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=True),
+    sa.Column('channel', sa.String(), nullable=False),
+    sa.Column('target', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('replayed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_dead_letters_created_at_id', 'notification_dead_letters', ['created_at', 'id'], unique=False)
+    op.create_index('ix_notification_dead_letters_target', 'notification_dead_letters', ['channel', 'target'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_dead_letters_target', table_name='notification_dead_letters')
+    op.drop_index('ix_notification_dead_letters_created_at_id', table_name='notification_dead_letters')
+    op.drop_table('notification_dead_letters')
@@ -3,13 +3,14 @@ import shutil
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.models.attachment import Attachment
 from app.models.message import Message
 from app.models.incident import Incident
 from app.schemas.attachment import AttachmentOut
 from app.dependencies.auth import get_current_user
 from app.models.user import User
+from app.security.headers import DOWNLOAD, header_profile
 from uuid import uuid4
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Header
 
@@ -20,9 +21,6 @@ MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
 
 router = APIRouter(prefix="/attachments", tags=["attachments"])
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
 
 router.post("/", response_model=AttachmentOut)
 async def upload_file(
@@ -66,7 +64,7 @@ async def upload_file(
     await db.refresh(attachment)
     return attachment
 
-@router.get("/{attachment_id}")
+@router.get("/{attachment_id}", dependencies=[Depends(header_profile(DOWNLOAD))])
 async def download_file(
     attachment_id: int,
     db: AsyncSession = Depends(get_db),
@@ -5,24 +5,22 @@ import pyotp
 import httpx
 import os
 import re
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import (
     UserCreate, Token, MFASetupOut, MFAVerifyIn, MFAVerifyOut
 )
 from app.core.security import hash_password, create_access_token
 from app.core.config import settings
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, require_realm_roles
+from app.services.user_cache import user_cache
 from sqlalchemy.exc import IntegrityError
-from app.security.keycloak import require_roles, get_current_claims
+from app.security.keycloak import get_current_claims
 
 router = APIRouter(tags=["auth"])
 
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
 
 def _set_auth_cookie(response: Response, token: str):
     response.set_cookie(
@@ -154,8 +152,9 @@ async def mfa_setup(
 ):
     secret = pyotp.random_base32()
     user.totp_secret = secret
-    db.merge(user)
+    await db.merge(user)
     await db.commit()
+    user_cache.invalidate(user.email)
 
     uri = pyotp.TOTP(secret).provisioning_uri(
         name=user.email,
@@ -180,6 +179,6 @@ async def get_me(current_user: User = Depends(get_current_user)):
 
 admin_router = APIRouter(prefix="/api/admin", tags=["admin"])
 
-@admin_router.get("/ping", dependencies=[Depends(require_roles("manager"))])
+@admin_router.get("/ping", dependencies=[Depends(require_realm_roles("manager"))])
 def admin_ping():
     return {"ok": True}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.db.database import pool_metrics
+from app.dependencies.auth import require_roles
+
+# Только админ (require_roles пропускает admin для любого списка ролей)
+router = APIRouter(
+    prefix="/api/admin/db",
+    tags=["admin"],
+    dependencies=[Depends(require_roles("admin"))],
+)
+
+
+@router.get("/pool")
+async def pool_stats():
+    """Состояние пула соединений: занятость, overflow, число выдач и время ожидания."""
+    return pool_metrics.snapshot()
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import get_db
+from app.db.pagination import keyset_page, split_page
+from app.dependencies.auth import require_roles
+from app.models.notification_dead_letter import NotificationDeadLetter as DeadLetter
+from app.services.notify import notification_service
+
+# Только админ (require_roles пропускает admin для любого списка ролей)
+router = APIRouter(
+    prefix="/api/admin/notifications",
+    tags=["admin"],
+    dependencies=[Depends(require_roles("admin"))],
+)
+
+
+def _out(d: DeadLetter) -> dict:
+    return {
+        "id": d.id,
+        "subscription_id": d.subscription_id,
+        "channel": d.channel,
+        "target": d.target,
+        "message": d.message,
+        "error": d.error,
+        "created_at": d.created_at,
+        "replayed_at": d.replayed_at,
+    }
+
+
+@router.get("/dead-letters")
+async def list_dead_letters(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    channel: Optional[str] = Query(None),
+    target: Optional[str] = Query(None),
+    include_replayed: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+):
+    filters = []
+    if channel:
+        filters.append(DeadLetter.channel == channel)
+    if target:
+        filters.append(DeadLetter.target == target)
+    if not include_replayed:
+        filters.append(DeadLetter.replayed_at.is_(None))
+
+    stmt = keyset_page(select(DeadLetter).where(*filters), DeadLetter.created_at, DeadLetter.id, cursor, limit)
+    rows, next_cursor = split_page((await db.execute(stmt)).scalars().all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_out(d) for d in rows]
+
+
+@router.get("/breakers")
+async def list_open_breakers():
+    """Цели, для которых доставка сейчас приостановлена (open / half_open)."""
+    return notification_service.breakers.snapshot()
+
+
+@router.post("/dead-letters/{dead_letter_id}/replay")
+async def replay_dead_letter(
+    dead_letter_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    dead_letter = await db.get(DeadLetter, dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    if dead_letter.replayed_at:
+        raise HTTPException(status_code=409, detail="Already replayed")
+
+    try:
+        await notification_service.replay(dead_letter.channel, dead_letter.target, dead_letter.message)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Replay failed: {e}")
+
+    dead_letter.replayed_at = datetime.now(timezone.utc)
+    await db.commit()
+    return _out(dead_letter)
@@ -1,23 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from sqlalchemy.future import select
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
+from app.db.pagination import keyset_page, split_page
 from app.models.incident import Incident
 from app.schemas.incident import IncidentCreate, IncidentOut
 from app.dependencies.auth import get_current_user, require_roles
 from app.models.user import User
 from app.models.incident_history import IncidentHistory
-from app.services.notify import send_notification_event
+from app.services.notify import enqueue_notification
+from app.services.cache import TTLCache
+from app.services import incident_rollup
 
 router = APIRouter(prefix="/api/incidents", tags=["incidents"])
 
+# размер страницы /my, если limit не передан
+DEFAULT_PAGE_SIZE = 50
+# total по одинаковым фильтрам считаем не чаще раза в INCIDENT_COUNT_CACHE_TTL секунд
+_count_cache = TTLCache(ttl=float(os.getenv("INCIDENT_COUNT_CACHE_TTL", "30")), maxsize=512)
 
-async def get_db():
-  async with SessionLocal() as session:
-      yield session
+# description — deferred-колонка; IncidentOut её отдаёт, поэтому там, где
+# возвращаем инцидент, грузим её явно.
+_with_description = undefer(Incident.description)
+_INCIDENT_COLUMNS = [c.key for c in Incident.__table__.columns]
+
+
+async def _reload(db: AsyncSession, incident: Incident) -> None:
+    """refresh() без списка атрибутов пропускает deferred-колонки."""
+    await db.refresh(incident, attribute_names=_INCIDENT_COLUMNS)
+
+
+async def _lock_incident(db: AsyncSession, incident_id: int) -> Optional[Incident]:
+    """Инцидент под FOR UPDATE до конца транзакции.
+
+    Статус проверяем и вклад в incident_daily_stats снимаем только под этой
+    блокировкой: параллельное изменение того же инцидента ждёт нашего commit
+    и видит уже новый статус.
+    """
+    result = await db.execute(
+        select(Incident).options(_with_description).where(Incident.id == incident_id).with_for_update()
+    )
+    return result.scalar()
 
 
 # --- CREATE (analyst/manager; admin проходит в require_roles автоматически) ---
@@ -49,6 +78,7 @@ async def create_incident(
     )
     db.add(incident)
     await db.flush()
+    await incident_rollup.add_incident(db, incident.id)
 
     db.add(IncidentHistory(
         incident_id=incident.id,
@@ -57,34 +87,71 @@ async def create_incident(
         details=None,
     ))
 
-    await db.commit()
-    await db.refresh(incident)
-
-    await send_notification_event(
+    # событие уходит в outbox в этой же транзакции, рассылает его воркер после commit
+    enqueue_notification(
+        db,
         "incident_created",
         f"Новый инцидент #{incident.id}: {incident.title}",
     )
+    await db.commit()
+    incident_rollup.mark_changed()
+    await _reload(db, incident)
     return incident
 
 
 # --- LIST MINE / ALL (по ролям) ---
+# Keyset-пагинация по (created_at, id): тело ответа — по-прежнему список,
+# курсор следующей страницы и total отдаются в заголовках.
+# Без limit отдаётся страница из DEFAULT_PAGE_SIZE записей, следующие фронт
+# запрашивает по X-Next-Cursor.
 @router.get("/my", response_model=List[IncidentOut], dependencies=[Depends(require_roles("client", "analyst", "manager"))])
 async def get_my_incidents(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    client_id: Optional[int] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    with_total: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    stmt = select(Incident)
-
-    if (current_user.role or "").lower() == "client":
-        stmt = stmt.where(Incident.client_id == current_user.id)
-    elif (current_user.role or "").lower() in ("analyst", "manager", "admin"):
+    role = (current_user.role or "").lower()
+    if role == "client":
+        # клиент видит только свои инциденты, client_id из запроса игнорируем
+        client_id = current_user.id
+    elif role not in ("analyst", "manager", "admin"):
         # аналитик/менеджер/админ — видят всё
-        pass
-    else:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    result = await db.execute(stmt.order_by(Incident.created_at.desc()))
-    return result.scalars().all()
+    filters = []
+    if client_id is not None:
+        filters.append(Incident.client_id == client_id)
+    if status:
+        filters.append(Incident.status == status)
+    if priority:
+        filters.append(Incident.priority == priority)
+    if created_from:
+        filters.append(Incident.created_at >= created_from)
+    if created_to:
+        filters.append(Incident.created_at <= created_to)
+
+    stmt = select(Incident).options(_with_description).where(*filters)
+    result = await db.execute(keyset_page(stmt, Incident.created_at, Incident.id, cursor, limit))
+    incidents, next_cursor = split_page(result.scalars().all(), limit)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if with_total:
+        key = (client_id, status, priority, created_from, created_to)
+        total = _count_cache.get(key)
+        if total is None:
+            total = (await db.execute(select(func.count()).select_from(Incident).where(*filters))).scalar_one()
+            _count_cache.set(key, total)
+        response.headers["X-Total-Count"] = str(total)
+    return incidents
 
 
 # --- GET ONE ---
@@ -94,7 +161,7 @@ async def get_incident(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await db.execute(select(Incident).where(Incident.id == incident_id))
+    result = await db.execute(select(Incident).options(_with_description).where(Incident.id == incident_id))
     incident = result.scalar()
 
     if not incident:
@@ -113,17 +180,19 @@ async def close_incident(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await db.execute(select(Incident).where(Incident.id == incident_id))
-    incident = result.scalar()
+    incident = await _lock_incident(db, incident_id)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
 
     if incident.status == "closed":
         raise HTTPException(status_code=400, detail="Incident already closed")
 
+    await incident_rollup.remove_incident(db, incident.id)
     incident.status = "closed"
     incident.closed_at = datetime.utcnow()
     db.add(incident)
+    await db.flush()
+    await incident_rollup.add_incident(db, incident.id)
 
     db.add(IncidentHistory(
         incident_id=incident.id,
@@ -132,13 +201,14 @@ async def close_incident(
         details=None,
     ))
 
-    await db.commit()
-    await db.refresh(incident)
-
-    await send_notification_event(
+    enqueue_notification(
+        db,
         "incident_closed",
         f"Инцидент #{incident.id} закрыт аналитиком",
     )
+    await db.commit()
+    incident_rollup.mark_changed()
+    await _reload(db, incident)
     return incident
 
 
@@ -149,7 +219,7 @@ async def confirm_incident(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await db.execute(select(Incident).where(Incident.id == incident_id))
+    result = await db.execute(select(Incident).options(_with_description).where(Incident.id == incident_id))
     incident = result.scalar()
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
@@ -163,13 +233,13 @@ async def confirm_incident(
         action="confirmed",
         details=None,
     ))
-    await db.commit()
-    await db.refresh(incident)
-
-    await send_notification_event(
+    enqueue_notification(
+        db,
         "incident_confirmed",
         f"Инцидент #{incident.id} подтверждён клиентом",
     )
+    await db.commit()
+    await _reload(db, incident)
     return incident
 
 
@@ -180,13 +250,15 @@ async def reopen_incident(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await db.execute(select(Incident).where(Incident.id == incident_id))
-    incident = result.scalar()
+    incident = await _lock_incident(db, incident_id)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
 
+    await incident_rollup.remove_incident(db, incident.id)
     incident.status = "open"
     db.add(incident)
+    await db.flush()
+    await incident_rollup.add_incident(db, incident.id)
 
     db.add(IncidentHistory(
         incident_id=incident.id,
@@ -195,13 +267,14 @@ async def reopen_incident(
         details=None,
     ))
 
-    await db.commit()
-    await db.refresh(incident)
-
-    await send_notification_event(
+    enqueue_notification(
+        db,
         "incident_reopened",
         f"Инцидент #{incident.id} переоткрыт",
     )
+    await db.commit()
+    incident_rollup.mark_changed()
+    await _reload(db, incident)
     return incident
 
 
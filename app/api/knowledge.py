@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import undefer
 from typing import List, Optional
 from app.db.database import get_db
 from app.models.knowledge_article import KnowledgeArticle
@@ -11,6 +12,10 @@ from app.dependencies.auth import get_current_user, require_roles
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
+# content — deferred; KnowledgeArticleOut его отдаёт, поэтому грузим явно
+_with_content = undefer(KnowledgeArticle.content)
+_ARTICLE_COLUMNS = [c.key for c in KnowledgeArticle.__table__.columns]
+
 @router.post("", response_model=KnowledgeArticleOut, dependencies=[Depends(require_roles("analyst", "manager"))])
 async def create_article(
     data: KnowledgeArticleCreate,
@@ -20,7 +25,7 @@ async def create_article(
     article = KnowledgeArticle(**data.dict(), created_by=user.id)
     db.add(article)
     await db.commit()
-    await db.refresh(article)
+    await db.refresh(article, attribute_names=_ARTICLE_COLUMNS)
     return article
 
 @router.get("", response_model=List[KnowledgeArticleOut])
@@ -29,7 +34,7 @@ async def list_articles(
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(KnowledgeArticle)
+    stmt = select(KnowledgeArticle).options(_with_content)
     if category:
         stmt = stmt.where(KnowledgeArticle.category == category)
     if search:
@@ -42,7 +47,7 @@ async def get_article(
     article_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).options(_with_content).where(KnowledgeArticle.id == article_id))
     article = result.scalar()
     if not article:
         raise HTTPException(404, "Article not found")
@@ -55,14 +60,14 @@ async def update_article(
     db: AsyncSession = Depends(get_db),
     
 ):
-    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).options(_with_content).where(KnowledgeArticle.id == article_id))
     article = result.scalar()
     if not article:
         raise HTTPException(404, "Article not found")
     for field, value in data.dict(exclude_unset=True).items():
         setattr(article, field, value)
     await db.commit()
-    await db.refresh(article)
+    await db.refresh(article, attribute_names=_ARTICLE_COLUMNS)
     return article
 
 @router.delete("/{article_id}", dependencies=[Depends(require_roles("manager", "admin"))])
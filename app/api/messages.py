@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.models.incident import Incident
@@ -18,9 +18,6 @@ router = APIRouter(prefix="/api/messages", tags=["messages"])
 UPLOAD_DIR = "attachments"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
 
 def _check_access(user: User, incident: Incident):
     # manager — чтение/запись оставляем; при желании сузить
@@ -76,7 +73,8 @@ async def send_message(
     )
     db.add(msg)
     await db.commit()
-    await db.refresh(msg)
+    # text — deferred-колонка, полный refresh её бы сбросил; нужен только created_at
+    await db.refresh(msg, attribute_names=["created_at"])
 
     # 5) отдаём форму, которую ждёт фронт (message вместо text)
     return {
@@ -104,11 +102,19 @@ async def get_messages(
 
     # 2) сообщения
     res = await db.execute(
-        select(Message)
+        select(
+            Message.id,
+            Message.incident_id,
+            Message.sender_id,
+            Message.sender_role,
+            Message.text,
+            Message.created_at,
+            Message.attachment,
+        )
         .where(Message.incident_id == incident_id)
         .order_by(Message.created_at.asc())
     )
-    rows = res.scalars().all()
+    rows = res.all()
 
     # 3) маппим под фронт
     return [
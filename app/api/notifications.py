@@ -1,19 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, desc
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.schemas.notification import NotificationCreate, NotificationOut
 from app.models.notification import Notification, NotificationChannel
 from app.dependencies.auth import get_current_user
 from app.models.user import User
+from app.services.notification_routing import notification_routes
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
 
 @router.post("", response_model=NotificationOut)
 async def create_notification(
@@ -26,10 +24,29 @@ async def create_notification(
         channel=data.channel,
         target=data.target,
         event=data.event,
+        rate_limit_per_minute=data.rate_limit_per_minute,
+        digest_window_seconds=data.digest_window_seconds,
     )
     db.add(notif)
     await db.commit()
     await db.refresh(notif)
+    notification_routes.invalidate()
+    return notif
+
+
+@router.post("/{notification_id}/deactivate", response_model=NotificationOut)
+async def deactivate_notification(
+    notification_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    notif = await db.get(Notification, notification_id)
+    if not notif or notif.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    notif.is_active = False
+    await db.commit()
+    await db.refresh(notif)
+    notification_routes.invalidate()
     return notif
 
 @router.get("", response_model=list[NotificationOut])
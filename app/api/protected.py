@@ -1,5 +1,14 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import get_db
+from app.db.pagination import decode_cursor, keyset_page, split_page
 from app.dependencies.auth import get_current_user, require_roles
+from app.models.audit_log import AuditLog
 from app.models.user import User
 
 router = APIRouter(prefix="/secure", tags=["secure"])
@@ -21,6 +30,55 @@ async def client_route(user: User = Depends(require_roles("client"))):
     dependencies=[Depends(require_roles("manager"))],
     summary="Просмотр audit-логов (только для менеджера)"
 )
-async def list_audit_logs():
-    # Здесь раньше был пустой SELECT -> 500. Оставлю заглушку.
-    return {"items": []}
+async def list_audit_logs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    user_id: Optional[int] = Query(None),
+    method: Optional[str] = Query(None),
+    status_code: Optional[int] = Query(None),
+    path: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Keyset-пагинация по (timestamp, id); фильтр по времени отсекает
+    # лишние месячные секции ещё на этапе планирования запроса.
+    filters = []
+    if user_id is not None:
+        filters.append(AuditLog.user_id == user_id)
+    if method:
+        filters.append(AuditLog.method == method.upper())
+    if status_code is not None:
+        filters.append(AuditLog.status_code == status_code)
+    if path:
+        filters.append(AuditLog.path == path)
+    if date_from:
+        filters.append(AuditLog.timestamp >= date_from)
+    if date_to:
+        filters.append(AuditLog.timestamp <= date_to)
+    if cursor:
+        # по сравнению кортежей (timestamp, id) Postgres секции не отсекает —
+        # дублируем верхнюю границу простым условием на timestamp
+        cursor_ts, _ = decode_cursor(cursor)
+        filters.append(AuditLog.timestamp <= cursor_ts)
+
+    stmt = keyset_page(select(AuditLog).where(*filters), AuditLog.timestamp, AuditLog.id, cursor, limit)
+    rows, next_cursor = split_page((await db.execute(stmt)).scalars().all(), limit, created_attr="timestamp")
+
+    return {
+        "items": [
+            {
+                "id": r.id,
+                "user_id": r.user_id,
+                "path": r.path,
+                "method": r.method,
+                "status_code": r.status_code,
+                "timestamp": r.timestamp,
+                "user_agent": r.user_agent,
+                "ip": r.ip,
+                "error": r.error,
+            }
+            for r in rows
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -1,21 +1,28 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import undefer
 from datetime import date, datetime, timedelta
-import io
+import os
 from typing import Optional
 
 from app.dependencies.auth import get_current_user
-from app.db.database import get_db
+from app.db.database import SessionLocal, get_db
 from app.models.user import User
+from app.security.headers import DOWNLOAD, header_profile
 from app.reports.utils import (
     fetch_incidents_by_date,
     generate_pdf,
     generate_csv,
     generate_excel,
+    stream_csv,
 )
+from app.reports import executor as report_executor
+from app.reports.executor import ReportRenderTimeout
 from app.services.email_sender import send_email_with_attachment
+from app.services.blob_store import get_blob_store
 from app.models.report import ReportArchive, ReportFormat
 
 router = APIRouter(prefix="/report", tags=["Reports"])
@@ -26,6 +33,20 @@ def check_report_access(user: User):
         raise HTTPException(status_code=403, detail="Access denied")
 
 
+async def _render(fn, *args) -> bytes:
+    try:
+        return await report_executor.render(fn, *args)
+    except ReportRenderTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def _render_file(fn, *args, suffix: str) -> str:
+    try:
+        return await report_executor.render_to_file(fn, *args, suffix=suffix)
+    except ReportRenderTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 def resolve_range(start_date: Optional[date], end_date: Optional[date]) -> tuple[date, date]:
     """Если даты не заданы — используем последние 7 дней."""
     if start_date and end_date:
@@ -44,11 +65,12 @@ async def get_pdf_report(
     check_report_access(user)
     start_date, end_date = resolve_range(start_date, end_date)
     data = await fetch_incidents_by_date(db, start_date, end_date)
-    pdf_bytes = generate_pdf(data, username=user.username)
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
+    path = await _render_file(generate_pdf, data, user.username, suffix=".pdf")
+    return FileResponse(
+        path,
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=incident_report.pdf"},
+        filename="incident_report.pdf",
+        background=BackgroundTask(os.remove, path),
     )
 
 
@@ -56,15 +78,19 @@ async def get_pdf_report(
 async def get_csv_report(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     check_report_access(user)
     start_date, end_date = resolve_range(start_date, end_date)
-    data = await fetch_incidents_by_date(db, start_date, end_date)
-    csv_bytes = generate_csv(data)
+
+    async def body():
+        # Отдельная сессия: ответ стримится уже после выхода из роута
+        async with SessionLocal() as stream_db:
+            async for chunk in stream_csv(stream_db, start_date, end_date):
+                yield chunk
+
     return StreamingResponse(
-        io.BytesIO(csv_bytes),
+        body(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=incident_report.csv"},
     )
@@ -80,11 +106,12 @@ async def get_excel_report(
     check_report_access(user)
     start_date, end_date = resolve_range(start_date, end_date)
     data = await fetch_incidents_by_date(db, start_date, end_date)
-    excel_bytes = generate_excel(data)
-    return StreamingResponse(
-        io.BytesIO(excel_bytes),
+    path = await _render_file(generate_excel, data, suffix=".xlsx")
+    return FileResponse(
+        path,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=incident_report.xlsx"},
+        filename="incident_report.xlsx",
+        background=BackgroundTask(os.remove, path),
     )
 
 
@@ -101,7 +128,7 @@ async def send_report_to_email(
     data = await fetch_incidents_by_date(db, start_date, end_date)
 
     if format == "pdf":
-        file_bytes = generate_pdf(data, username=user.username)
+        file_bytes = await _render(generate_pdf, data, user.username)
         mime = "application/pdf"
         filename = "incident_report.pdf"
     elif format == "csv":
@@ -109,14 +136,15 @@ async def send_report_to_email(
         mime = "text/csv"
         filename = "incident_report.csv"
     else:
-        file_bytes = generate_excel(data)
+        file_bytes = await _render(generate_excel, data)
         mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         filename = "incident_report.xlsx"
 
     new_report = ReportArchive(
         filename=filename,
         format=ReportFormat(format),
-        content=file_bytes,
+        content_sha256=await get_blob_store().put(file_bytes),
+        size=len(file_bytes),
         generated_by_id=user.id,
     )
     db.add(new_report)
@@ -135,13 +163,47 @@ async def send_report_to_email(
     return {"message": f"Report sent to {user.email}"}
 
 
-@router.get("/archive/{report_id}")
+def _parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """`Range: bytes=a-b` (один диапазон) -> (start, end) включительно; None — весь файл."""
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None  # мульти-диапазоны не поддерживаем — отдаём файл целиком
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # суффикс: последние N байт
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+async def _iter_bytes(data: bytes, start: int, end: int, chunk_size: int = 64 * 1024):
+    for offset in range(start, end + 1, chunk_size):
+        yield data[offset:min(offset + chunk_size, end + 1)]
+
+
+@router.get("/archive/{report_id}", dependencies=[Depends(header_profile(DOWNLOAD))])
 async def download_report(
     report_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    report = await db.get(ReportArchive, report_id)
+    # content непустой только у старых строк, ещё не перенесённых в blob store
+    report = await db.get(ReportArchive, report_id, options=[undefer(ReportArchive.content)])
     if not report or (user.role != "manager" and report.generated_by_id != user.id):
         raise HTTPException(status_code=404, detail="Not found")
 
@@ -151,10 +213,29 @@ async def download_report(
         "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     }[report.format.value]
 
+    size = report.size if report.content_sha256 else len(report.content or b"")
+    byte_range = _parse_range(range_header, size)
+    start, end = byte_range or (0, size - 1)
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={report.filename}",
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(max(end - start + 1, 0)),
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if report.content_sha256:
+        body = get_blob_store().iter_range(report.content_sha256, start, end)
+    else:
+        # старая строка, ещё не перенесённая в blob store
+        body = _iter_bytes(report.content or b"", start, end)
+
     return StreamingResponse(
-        io.BytesIO(report.content),
+        body,
+        status_code=206 if byte_range else 200,
         media_type=media,
-        headers={"Content-Disposition": f"attachment; filename={report.filename}"},
+        headers=headers,
     )
 
 
@@ -166,10 +247,15 @@ async def list_reports(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    if user.role == "manager":
-        stmt = select(ReportArchive)
-    else:
-        stmt = select(ReportArchive).where(ReportArchive.generated_by_id == user.id)
+    # только то, что отдаём: без content и прочих колонок
+    stmt = select(
+        ReportArchive.id,
+        ReportArchive.filename,
+        ReportArchive.format,
+        ReportArchive.generated_at,
+    )
+    if user.role != "manager":
+        stmt = stmt.where(ReportArchive.generated_by_id == user.id)
 
     if start_date:
         stmt = stmt.where(
@@ -184,7 +270,7 @@ async def list_reports(
 
     stmt = stmt.order_by(ReportArchive.generated_at.desc())
     result = await db.execute(stmt)
-    reports = result.scalars().all()
+    reports = result.all()
 
     return [
         {
@@ -5,9 +5,9 @@ from app.db.database import get_db
 from app.models.role_request import RoleRequest
 from app.models.user import User
 from app.schemas.role_request import RoleRequestCreate, RoleRequestOut
-from app.dependencies.auth import get_current_user
-from app.security.keycloak import require_roles        # guard для админа
+from app.dependencies.auth import get_current_user, require_realm_roles   # guard для админа: только KC
 from app.security.keycloak_admin import assign_realm_role_to_email
+from app.services.user_cache import user_cache
 from datetime import datetime
 
 router = APIRouter(prefix="/roles", tags=["roles"])
@@ -30,17 +30,17 @@ async def request_role(payload: RoleRequestCreate,
     await db.commit(); await db.refresh(rr)
     return rr
 
-@router.get("/requests", response_model=list[RoleRequestOut], dependencies=[Depends(require_roles("admin"))])
+@router.get("/requests", response_model=list[RoleRequestOut], dependencies=[Depends(require_realm_roles("admin"))])
 async def list_requests(status: str = "pending", db: AsyncSession = Depends(get_db)):
     q = await db.execute(select(RoleRequest).where(RoleRequest.status == status).order_by(RoleRequest.id.desc()))
     return q.scalars().all()
 
-@router.get("/requests/count", dependencies=[Depends(require_roles("admin"))])
+@router.get("/requests/count", dependencies=[Depends(require_realm_roles("admin"))])
 async def count_requests(status: str = "pending", db: AsyncSession = Depends(get_db)):
     q = await db.execute(select(func.count()).select_from(RoleRequest).where(RoleRequest.status == status))
     return {"count": int(q.scalar() or 0)}
 
-@router.post("/requests/{req_id}/approve", response_model=RoleRequestOut, dependencies=[Depends(require_roles("admin"))])
+@router.post("/requests/{req_id}/approve", response_model=RoleRequestOut, dependencies=[Depends(require_realm_roles("admin"))])
 async def approve_request(req_id: int, db: AsyncSession = Depends(get_db)):
     rr = await db.get(RoleRequest, req_id)
     if not rr or rr.status != "pending":
@@ -56,9 +56,12 @@ async def approve_request(req_id: int, db: AsyncSession = Depends(get_db)):
     rr.decided_by = user.id  # при желании подставь id админа из токена
     rr.decided_at = datetime.utcnow()
     await db.commit(); await db.refresh(rr)
+    # роль сменилась в KC — сбрасываем кэш пользователя (только в этом процессе,
+    # остальные воркеры догонят через USER_CACHE_TTL)
+    user_cache.invalidate(user.email)
     return rr
 
-@router.post("/requests/{req_id}/reject", response_model=RoleRequestOut, dependencies=[Depends(require_roles("admin"))])
+@router.post("/requests/{req_id}/reject", response_model=RoleRequestOut, dependencies=[Depends(require_realm_roles("admin"))])
 async def reject_request(req_id: int, comment: str | None = None, db: AsyncSession = Depends(get_db)):
     rr = await db.get(RoleRequest, req_id)
     if not rr or rr.status != "pending":
@@ -1,45 +1,66 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func
 from app.db.database import get_db
 from app.models.incident import Incident
+from app.models.incident_daily_stats import IncidentDailyStats as Stats
+from app.services import incident_rollup
+from app.services.cache import TTLCache
 import datetime
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional
 
 router = APIRouter(prefix="/api", tags=["slametrics"])
 
-@router.get("/slametrics")
-async def sla_metrics(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Incident))
-    incidents = result.scalars().all()
+CLOSED_STATUSES = ("closed", "Закрыт")
+
+_threat_cache = TTLCache(ttl=float(os.getenv("THREAT_LEVEL_CACHE_TTL", "15")), maxsize=64)
+
 
-    response_durations = []
-    resolution_durations = []
-    total_closed = 0
-    total_open = 0
+def _minutes(expr):
+    """Длительность interval в минутах (для агрегатов в SQL)."""
+    return func.extract("epoch", expr) / 60
 
-    for inc in incidents:
-        if inc.status in ["closed", "Закрыт"]:
-            total_closed += 1
-        else:
-            total_open += 1
 
-        if inc.first_response_at:
-            diff = (inc.first_response_at - inc.created_at).total_seconds() / 60
-            response_durations.append(diff)
+def _round(value) -> float:
+    return round(float(value), 2) if value is not None else 0
 
-        if inc.closed_at:
-            diff = (inc.closed_at - inc.created_at).total_seconds() / 60
-            resolution_durations.append(diff)
 
-    avg_response = round(sum(response_durations) / len(response_durations), 2) if response_durations else 0
-    avg_resolution = round(sum(resolution_durations) / len(resolution_durations), 2) if resolution_durations else 0
+@router.get("/slametrics")
+async def sla_metrics(
+    start: Optional[datetime.datetime] = Query(None),
+    end: Optional[datetime.datetime] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """SLA по инцидентам (опционально в окне created_at ∈ [start, end]) — один агрегатный запрос."""
+    response = _minutes(Incident.first_response_at - Incident.created_at)
+    resolution = _minutes(Incident.closed_at - Incident.created_at)
+    stmt = select(
+        func.count().label("total"),
+        func.count().filter(Incident.status.in_(CLOSED_STATUSES)).label("closed"),
+        func.avg(response).label("avg_response"),
+        func.avg(resolution).label("avg_resolution"),
+        func.percentile_cont(0.5).within_group(response).label("p50_response"),
+        func.percentile_cont(0.9).within_group(response).label("p90_response"),
+        func.percentile_cont(0.5).within_group(resolution).label("p50_resolution"),
+        func.percentile_cont(0.9).within_group(resolution).label("p90_resolution"),
+    )
+    if start:
+        stmt = stmt.where(Incident.created_at >= start)
+    if end:
+        stmt = stmt.where(Incident.created_at <= end)
+
+    row = (await db.execute(stmt)).one()
 
     return {
-        "avg_response_minutes": avg_response,
-        "avg_resolution_minutes": avg_resolution,
-        "total_closed": total_closed,
-        "total_open": total_open
+        "avg_response_minutes": _round(row.avg_response),
+        "avg_resolution_minutes": _round(row.avg_resolution),
+        "p50_response_minutes": _round(row.p50_response),
+        "p90_response_minutes": _round(row.p90_response),
+        "p50_resolution_minutes": _round(row.p50_resolution),
+        "p90_resolution_minutes": _round(row.p90_resolution),
+        "total_closed": row.closed,
+        "total_open": row.total - row.closed,
     }
 
 @router.get("/threat-level")
@@ -49,25 +70,37 @@ async def get_threat_level(
 ):
     """Calculate threat level based on incidents in the specified period."""
     
+    # Кэш привязан к версии изменений инцидентов: после create/close/reopen
+    # ключ меняется сам; TTL ограничивает устаревание между воркерами.
+    cache_key = (period_days, incident_rollup.version())
+    cached = _threat_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     # Calculate date range
     end_date = datetime.datetime.utcnow()
     start_date = end_date - datetime.timedelta(days=period_days)
+    prev_start = start_date - datetime.timedelta(days=period_days)
     
-    # Get incidents in the period
-    result = await db.execute(
-        select(Incident).where(
-            and_(
-                Incident.created_at >= start_date,
-                Incident.created_at <= end_date
-            )
+    # Текущее и предыдущее окно — одним проходом по incident_daily_stats
+    current = Stats.day >= start_date.date()
+    row = (await db.execute(
+        select(
+            func.coalesce(func.sum(Stats.incidents).filter(current), 0).label("total"),
+            func.coalesce(func.sum(Stats.incidents).filter(current, Stats.priority == "high"), 0).label("high"),
+            func.coalesce(func.sum(Stats.incidents).filter(current, Stats.status == "open"), 0).label("open"),
+            func.coalesce(func.sum(Stats.incidents).filter(~current), 0).label("prev_total"),
+        ).where(
+            Stats.day >= prev_start.date(),
+            Stats.day <= end_date.date(),
         )
-    )
-    incidents = result.scalars().all()
-    
+    )).one()
+
     # Calculate metrics
-    total_incidents = len(incidents)
-    high_priority = len([i for i in incidents if i.priority == "high"])
-    open_incidents = len([i for i in incidents if i.status == "open"])
+    total_incidents = row.total
+    high_priority = row.high
+    open_incidents = row.open
+    prev_total = row.prev_total
     
     # Calculate threat level (0-100 scale)
     threat_score = 0
@@ -103,25 +136,13 @@ async def get_threat_level(
         color = "secondary"
     
     # Calculate trend (compare with previous period)
-    prev_start = start_date - datetime.timedelta(days=period_days)
-    prev_result = await db.execute(
-        select(Incident).where(
-            and_(
-                Incident.created_at >= prev_start,
-                Incident.created_at < start_date
-            )
-        )
-    )
-    prev_incidents = prev_result.scalars().all()
-    prev_total = len(prev_incidents)
-    
     trend = "stable"
     if total_incidents > prev_total * 1.2:
         trend = "increasing"
     elif total_incidents < prev_total * 0.8:
         trend = "decreasing"
     
-    return {
+    result = {
         "threat_score": threat_score,
         "threat_level": threat_level,
         "color": color,
@@ -133,6 +154,8 @@ async def get_threat_level(
         "period_start": start_date.isoformat(),
         "period_end": end_date.isoformat()
     }
+    _threat_cache.set(cache_key, result)
+    return result
 
 @router.get("/incident-stats")
 async def get_incident_stats(
@@ -144,20 +167,25 @@ async def get_incident_stats(
     end_date = datetime.datetime.utcnow()
     start_date = end_date - datetime.timedelta(days=period_days)
     
-    # Get incidents in the period
-    result = await db.execute(
-        select(Incident).where(
-            and_(
-                Incident.created_at >= start_date,
-                Incident.created_at <= end_date
-            )
-        )
-    )
-    incidents = result.scalars().all()
+    rows = (await db.execute(
+        select(
+            Stats.day,
+            Stats.status,
+            Stats.priority,
+            func.sum(Stats.incidents).label("incidents"),
+            func.sum(Stats.response_minutes).label("response_minutes"),
+            func.sum(Stats.responded).label("responded"),
+            func.sum(Stats.resolution_minutes).label("resolution_minutes"),
+            func.sum(Stats.resolved).label("resolved"),
+        ).where(
+            Stats.day >= start_date.date(),
+            Stats.day <= end_date.date(),
+        ).group_by(Stats.day, Stats.status, Stats.priority)
+    )).all()
     
     # Calculate statistics
     stats = {
-        "total": len(incidents),
+        "total": 0,
         "by_status": {},
         "by_priority": {},
         "by_day": {},
@@ -165,36 +193,27 @@ async def get_incident_stats(
         "avg_resolution_time": 0
     }
     
-    response_times = []
-    resolution_times = []
-    
-    for incident in incidents:
-        # Status breakdown
-        status = incident.status
-        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
-        
-        # Priority breakdown
-        priority = incident.priority
-        stats["by_priority"][priority] = stats["by_priority"].get(priority, 0) + 1
-        
-        # Daily breakdown
-        day = incident.created_at.strftime("%Y-%m-%d")
-        stats["by_day"][day] = stats["by_day"].get(day, 0) + 1
-        
-        # Response time
-        if incident.first_response_at:
-            response_time = (incident.first_response_at - incident.created_at).total_seconds() / 60
-            response_times.append(response_time)
+    response_minutes = resolution_minutes = 0.0
+    responded = resolved = 0
+    
+    for row in rows:
+        if not row.incidents:
+            continue
+        stats["total"] += row.incidents
+        stats["by_status"][row.status] = stats["by_status"].get(row.status, 0) + row.incidents
+        stats["by_priority"][row.priority] = stats["by_priority"].get(row.priority, 0) + row.incidents
+        day = row.day.strftime("%Y-%m-%d")
+        stats["by_day"][day] = stats["by_day"].get(day, 0) + row.incidents
         
-        # Resolution time
-        if incident.closed_at:
-            resolution_time = (incident.closed_at - incident.created_at).total_seconds() / 60
-            resolution_times.append(resolution_time)
+        response_minutes += row.response_minutes
+        responded += row.responded
+        resolution_minutes += row.resolution_minutes
+        resolved += row.resolved
     
     # Calculate averages
-    if response_times:
-        stats["avg_response_time"] = round(sum(response_times) / len(response_times), 2)
-    if resolution_times:
-        stats["avg_resolution_time"] = round(sum(resolution_times) / len(resolution_times), 2)
+    if responded:
+        stats["avg_response_time"] = round(response_minutes / responded, 2)
+    if resolved:
+        stats["avg_resolution_time"] = round(resolution_minutes / resolved, 2)
     
     return stats
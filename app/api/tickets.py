@@ -3,22 +3,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
 
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.models.ticket import Ticket
 from app.models.ticket_message import TicketMessage
 from app.schemas.ticket import TicketCreate, TicketOut, TicketMessageOut, TicketWithMessages
 from app.dependencies.auth import get_current_user, require_roles
 from app.models.user import User
 from sqlalchemy.orm import selectinload
-from app.services.notify import send_notification_event
+from app.services.notify import enqueue_notification
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
-
 
 @router.post(
     "",
@@ -41,13 +37,13 @@ async def create_ticket(
         message=data.message,
     )
     db.add(message)
-    await db.commit()
-    await db.refresh(ticket)
-
-    await send_notification_event(
+    enqueue_notification(
+        db,
         "ticket_created",
         f"Новый тикет #{ticket.id}: {ticket.title}",
     )
+    await db.commit()
+    await db.refresh(ticket)
     return ticket
 
 
@@ -147,11 +143,11 @@ async def reply_ticket(
         message=message,
     )
     db.add(msg)
-    await db.commit()
-    await db.refresh(msg)
-
-    await send_notification_event(
+    enqueue_notification(
+        db,
         "ticket_replied",
         f"Новый ответ в тикете #{ticket_id}",
     )
+    await db.commit()
+    await db.refresh(msg)
     return msg
@@ -21,6 +21,20 @@ class Settings(BaseSettings):
     # Доп. секреты (если нужны)
     CSRF_SECRET: str = "dev-csrf"
 
+    # Заголовки безопасности / CSP (app/security/headers.py)
+    # Хосты, для которых действует ослабленная dev-политика (Vite, eval, inline)
+    SECURITY_LOCAL_HOSTS: List[str] = ["localhost", "127.0.0.1"]
+    CSP_DEV_CONNECT_SRC: List[str] = [
+        "http://localhost:8000",
+        "http://127.0.0.1:8000",
+        "http://localhost:8080",
+        "http://127.0.0.1:8080",
+        "http://localhost:5173",
+        "ws://localhost:5173",
+    ]
+    # CDN, с которого Swagger/Redoc тянут скрипты и стили
+    CSP_DOCS_CDN: str = "https://cdn.jsdelivr.net"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore",
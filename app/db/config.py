@@ -0,0 +1,75 @@
+"""Engine / connection pool settings (env), shared by the async and sync engines.
+
+Every connection gets statement_timeout as a session setting, so a runaway
+query is cancelled by the server instead of holding a pooled connection.
+SQL echo is off unless DB_ECHO is set — it logs every statement synchronously
+and is meant for local debugging only.
+"""
+import os
+from typing import Any
+
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import MeteredAsyncPool, MeteredPool, PoolMetrics
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+DB_ECHO = _flag("DB_ECHO", "false")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _flag("DB_POOL_PRE_PING", "true")
+# 0 disables the timeout
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+# SQLAlchemy's per-connection cache of asyncpg prepared statements; set 0 behind
+# pgbouncer in transaction mode
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+
+
+def _pool_kwargs(poolclass: type[QueuePool]) -> dict[str, Any]:
+    return {
+        "echo": DB_ECHO,
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def async_engine_kwargs(url: str) -> dict[str, Any]:
+    """create_async_engine() arguments for DATABASE_URL."""
+    if not url.startswith("postgresql+asyncpg"):
+        return {"echo": DB_ECHO}
+    connect_args: dict[str, Any] = {
+        "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    return {**_pool_kwargs(MeteredAsyncPool), "connect_args": connect_args}
+
+
+def sync_engine_kwargs(url: str) -> dict[str, Any]:
+    """create_engine() arguments for SYNC_DB_URL."""
+    if not url.startswith("postgresql"):
+        return {"echo": DB_ECHO}
+    connect_args: dict[str, Any] = {}
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return {**_pool_kwargs(MeteredPool), "connect_args": connect_args}
+
+
+def attach_metrics(engine, name: str) -> PoolMetrics:
+    """Metrics of the engine's pool (a no-op collector for non-metered pools)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    if isinstance(sync_engine.pool, (MeteredPool, MeteredAsyncPool)):
+        sync_engine.pool.metrics = metrics
+        metrics.pool = sync_engine.pool
+    return metrics
+
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.db.base import Base
+from app.db.config import async_engine_kwargs, attach_metrics
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
@@ -13,7 +14,8 @@ DATABASE_URL = os.getenv(
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set!")
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(DATABASE_URL, future=True, **async_engine_kwargs(DATABASE_URL))
+pool_metrics = attach_metrics(engine, "async")
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
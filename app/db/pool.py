@@ -0,0 +1,84 @@
+"""QueuePool variants that record checkout metrics.
+
+wait_seconds is the time spent in pool.connect(): waiting for a free slot,
+opening a new connection when the pool grows into overflow, and the pre-ping.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[QueuePool] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_max = 0
+        self._lock = threading.Lock()  # the sync engine is used from worker threads
+
+    def observe(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            if self.pool is not None:
+                self.overflow_max = max(self.overflow_max, self.pool.overflow())
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "name": self.name,
+                "size": pool.size() if pool is not None else None,
+                "checked_out": pool.checkedout() if pool is not None else None,
+                "idle": pool.checkedin() if pool is not None else None,
+                "overflow": max(0, pool.overflow()) if pool is not None else None,
+                "overflow_max": self.overflow_max,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / attempts, 6) if attempts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _MeteredMixin:
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep the counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class MeteredPool(_MeteredMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncPool(_MeteredMixin, AsyncAdaptedQueuePool):
+    pass
@@ -2,8 +2,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from app.db.base import Base
+from app.db.config import attach_metrics, sync_engine_kwargs
 
 DATABASE_URL = os.getenv("SYNC_DB_URL") or "postgresql+psycopg2://postgres:postgres@db:5432/soc_portal"
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, **sync_engine_kwargs(DATABASE_URL))
+pool_metrics = attach_metrics(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
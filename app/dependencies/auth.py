@@ -7,13 +7,16 @@ from typing import Optional, Iterable
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader
 from jose import JWTError, jwt
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.config import settings
-from app.db.database import SessionLocal
+from app.db.database import get_db
 from app.models.user import User
 from app.security.keycloak import get_current_claims, get_roles
+from app.services.user_cache import user_cache
 
 bearer_scheme = APIKeyHeader(name="Authorization", auto_error=False)
 
@@ -22,9 +25,9 @@ ALGORITHM = settings.ALGORITHM
 
 
 # ---------- DB session ----------
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
+# get_db берём из app.db.database — одна функция на всё приложение:
+# FastAPI кэширует зависимость в рамках запроса, поэтому аутентификация
+# и сам роут делят одну сессию.
 
 
 # ---------- helpers ----------
@@ -71,65 +74,78 @@ async def _generate_unique_username(db: AsyncSession, base: str) -> str:
         candidate = f"{base}{idx}"[:40]
 
 
-# ---------- main ----------
-async def get_current_user(
-    request: Request,
-    authorization: Optional[str] = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """
-    1) Если пришёл Bearer: валидируем KC-токен, создаём пользователя при необходимости,
-       username делаем уникальным, роль синхронизируем с KC.
-    2) Иначе — локальная cookie-сессия.
+# ---------- auth context ----------
+class AuthContext:
+    """Кто делает запрос: пользователь, его роли и (если есть) KC-claims.
+
+    Собирается один раз на запрос в get_auth_context и переиспользуется
+    get_current_user / require_roles.
     """
 
-    # --- 1) Keycloak Bearer поток ---
-    if authorization and authorization.lower().startswith("bearer "):
-        try:
-            claims = get_current_claims(authorization)  # 401, если токен невалиден
-            email = claims.get("email")
-            if not email:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Email claim missing in token",
-                )
-
-            # username формируем на основе email, а не preferred_username (чтобы не словить 'admin' -> конфликт)
-            email_local = email.split("@", 1)[0]
-            kc_roles = get_roles(claims)
-            effective_role = pick_role(kc_roles)
-
-            # Ищем по email — это «ключ» для одного и того же человека
-            res = await db.execute(select(User).where(User.email == email))
-            user: Optional[User] = res.scalar_one_or_none()
-
-            if not user:
-                # подбираем уникальный username
-                username = await _generate_unique_username(db, email_local)
-                user = User(
-                    email=email,
-                    username=username,
-                    role=effective_role or "client",
-                    hashed_password="",  # для KC пароль не храним
-                )
-                db.add(user)
-                await db.commit()
-                await db.refresh(user)
-            else:
-                # синхронизируем роль из KC -> БД
-                if effective_role and user.role != effective_role:
-                    user.role = effective_role
-                    db.add(user)
-                    await db.commit()
-                    await db.refresh(user)
-
-            return user
+    __slots__ = ("user", "roles", "claims")
 
-        except HTTPException:
-            # Переходим к cookie-потоку
-            ...
+    def __init__(self, user: User, roles: set[str], claims: Optional[dict] = None):
+        self.user = user
+        self.roles = frozenset(roles)
+        self.claims = claims
 
-    # --- 2) Локальный cookie-поток ---
+    @property
+    def is_admin(self) -> bool:
+        return (self.user.role or "").lower() == "admin"
+
+    def has_any_role(self, allowed: Iterable[str]) -> bool:
+        return self.is_admin or bool(self.roles & set(allowed))
+
+
+async def _user_from_claims(claims: dict, db: AsyncSession) -> User:
+    """KC-токен -> User: создаём при необходимости, роль синхронизируем с KC."""
+    email = claims.get("email")
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email claim missing in token",
+        )
+
+    # username формируем на основе email, а не preferred_username (чтобы не словить 'admin' -> конфликт)
+    email_local = email.split("@", 1)[0]
+    effective_role = pick_role(get_roles(claims))
+
+    # Ищем по email — это «ключ» для одного и того же человека.
+    # Сначала — in-process кэш, в БД идём только при промахе.
+    user: Optional[User] = user_cache.get(email)
+    cached = user is not None
+    if not cached:
+        res = await db.execute(select(User).where(User.email == email))
+        user = res.scalar_one_or_none()
+
+    if not user:
+        # подбираем уникальный username
+        username = await _generate_unique_username(db, email_local)
+        user = User(
+            email=email,
+            username=username,
+            role=effective_role or "client",
+            hashed_password="",  # для KC пароль не храним
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        user_cache.put(user)
+    elif effective_role and user.role != effective_role:
+        # синхронизируем роль из KC -> БД (только если реально отличается)
+        await db.execute(
+            update(User).where(User.id == user.id).values(role=effective_role)
+        )
+        await db.commit()
+        set_committed_value(user, "role", effective_role)
+        user_cache.put(user)
+    elif not cached:
+        user_cache.put(user)
+
+    return user
+
+
+async def _user_from_cookie(request: Request, db: AsyncSession) -> User:
     cookie_token = request.cookies.get("access_token")
     if not cookie_token:
         raise HTTPException(
@@ -151,45 +167,95 @@ async def get_current_user(
             detail=f"Token decode error: {e}",
         )
 
-    res = await db.execute(select(User).where(User.email == email))
-    user = res.scalar_one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    user = user_cache.get(email)
+    if user is None:
+        res = await db.execute(select(User).where(User.email == email))
+        user = res.scalar_one_or_none()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        user_cache.put(user)
     return user
 
 
+async def get_auth_context(
+    request: Request,
+    authorization: Optional[str] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> AuthContext:
+    """
+    Единая зависимость аутентификации: заголовок разбираем один раз,
+    токен проверяем один раз, User достаём один раз.
+
+    1) Если пришёл Bearer: валидируем KC-токен, создаём пользователя при необходимости,
+       username делаем уникальным, роль синхронизируем с KC.
+    2) Иначе (или если Bearer невалиден) — локальная cookie-сессия.
+    """
+    ctx: Optional[AuthContext] = getattr(request.state, "auth", None)
+    if ctx is not None:
+        return ctx
+
+    # --- 1) Keycloak Bearer поток ---
+    if authorization and authorization.lower().startswith("bearer "):
+        try:
+            claims = await get_current_claims(request, authorization)  # 401, если токен невалиден
+            user = await _user_from_claims(claims, db)
+            roles = _normalize_roles(get_roles(claims))
+            roles.add((user.role or "").lower())
+            ctx = AuthContext(user, roles, claims)
+        except HTTPException:
+            # Переходим к cookie-потоку
+            ...
+
+    # --- 2) Локальный cookie-поток ---
+    if ctx is None:
+        user = await _user_from_cookie(request, db)
+        ctx = AuthContext(user, {(user.role or "").lower()})
+
+    request.state.auth = ctx
+    return ctx
+
+
+async def get_current_user(ctx: AuthContext = Depends(get_auth_context)) -> User:
+    return ctx.user
+
+
 def require_roles(*allowed_roles: str):
     allowed = {r.lower() for r in allowed_roles}
 
-    async def checker(
-        request: Request,
-        user: User = Depends(get_current_user),
-        authorization: Optional[str] = Depends(bearer_scheme),
-    ) -> User:
-        # Если админ — доступ везде
-        if (user.role or "").lower() == "admin":
-            return user
-
-        # Проверяем KC-токен
-        if authorization and authorization.lower().startswith("bearer "):
-            try:
-                claims = get_current_claims(authorization)
-                kc = _normalize_roles(get_roles(claims))
-                if kc & allowed:
-                    return user
-            except HTTPException:
-                pass
-
-        # Проверяем локальную роль
-        if (user.role or "").lower() in allowed:
-            return user
+    async def checker(ctx: AuthContext = Depends(get_auth_context)) -> User:
+        # Админ проходит везде; иначе — KC-роли или локальная роль
+        if ctx.has_any_role(allowed):
+            return ctx.user
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Access denied. Allowed roles: {', '.join(sorted(allowed))}",
         )
 
-    return checker
\ No newline at end of file
+    return checker
+
+
+def require_realm_roles(*allowed_roles: str):
+    """Только Keycloak Bearer и точное совпадение realm-роли, без обхода для админа.
+
+    Для маршрутов, которые раньше закрывал guard из app.security.keycloak
+    (заявки на роли, /api/admin/ping): cookie-сессия сюда не пускается,
+    soc_/ROLE_ префиксы не нормализуются, локальная роль admin не помогает.
+    Контекст берём тот же, что у require_roles, — токен проверяется один раз.
+    """
+    allowed = set(allowed_roles)
+
+    async def checker(ctx: AuthContext = Depends(get_auth_context)) -> dict:
+        if ctx.claims is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Keycloak bearer token required",
+            )
+        if not allowed & set(get_roles(ctx.claims)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        return ctx.claims
+
+    return checker
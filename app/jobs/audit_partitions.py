@@ -0,0 +1,10 @@
+from app.db.database import SessionLocal
+from app.services.audit_partitions import drop_old_partitions, ensure_partitions
+
+
+async def maintain_audit_partitions():
+    """Создать секции audit_logs наперёд и удалить вышедшие за срок хранения."""
+    async with SessionLocal() as db:
+        created = await ensure_partitions(db)
+        dropped = await drop_old_partitions(db)
+    print(f"[+] Audit partitions ensured: {', '.join(created)}; dropped: {', '.join(dropped) or 'none'}.")
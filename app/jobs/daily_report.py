@@ -4,42 +4,74 @@ from app.db.database import SessionLocal
 from app.models.user import User
 from app.services.email_sender import send_email_with_attachment
 from app.reports.utils import generate_pdf, fetch_incidents_by_date
+from app.reports.executor import render
+from app.services.blob_store import get_blob_store
+
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert
+
+# Сколько писем отправляем параллельно
+DAILY_REPORT_SMTP_CONCURRENCY = int(os.getenv("DAILY_REPORT_SMTP_CONCURRENCY", "5"))
 
-from datetime import date, timedelta
-from sqlalchemy import select
 
 async def generate_daily_reports():
+    """Один запрос, один рендер, одна вставка архива, параллельная (ограниченно) рассылка."""
     print("[*] Running daily report generation...")
-    async with SessionLocal() as db:
-        today = date.today()
-        yesterday = today - timedelta(days=1)
+    today = date.today()
+    yesterday = today - timedelta(days=1)
 
+    async with SessionLocal() as db:
         result = await db.execute(
-            select(User).where(User.role.in_(["analyst", "manager"]))
+            select(User.id, User.email).where(User.role.in_(["analyst", "manager"]))
         )
-        users = result.scalars().all()
+        recipients = result.all()
+        if not recipients:
+            print("[+] No recipients for daily report.")
+            return
 
-        for user in users:
-            data = await fetch_incidents_by_date(db, yesterday, today)
-            file_bytes = generate_pdf(data, username=user.username)
+        data = await fetch_incidents_by_date(db, yesterday, today)
+        # Отчёт одинаковый для всех получателей — в подвале вместо имени пользователя
+        file_bytes = await render(generate_pdf, data, "SOC Portal (daily report)")
+        filename = f"daily_report_{today}.pdf"
+        # один файл в blob store, строки архива ссылаются на него по sha256
+        content_key = await get_blob_store().put(file_bytes)
 
-            archive = ReportArchive(
-                filename=f"daily_report_{today}.pdf",
-                format=ReportFormat.pdf,
-                content=file_bytes,
-                generated_by_id=user.id
-            )
-            db.add(archive)
-            await db.commit()
-            await db.refresh(archive)
+        generated_at = datetime.utcnow()
+        await db.execute(
+            insert(ReportArchive),
+            [
+                {
+                    "filename": filename,
+                    "format": ReportFormat.pdf,
+                    "content_sha256": content_key,
+                    "size": len(file_bytes),
+                    "generated_at": generated_at,
+                    "generated_by_id": user_id,
+                }
+                for user_id, _ in recipients
+            ],
+        )
+        await db.commit()
 
+    slots = asyncio.Semaphore(DAILY_REPORT_SMTP_CONCURRENCY)
+
+    async def send(email: str):
+        async with slots:
             await send_email_with_attachment(
-                to_email=user.email,
+                to_email=email,
                 subject="Daily SOC Report",
                 body="Your daily report is attached.",
-                filename=archive.filename,
+                filename=filename,
                 file_bytes=file_bytes,
                 mime_type="application/pdf"
             )
 
-        print("[+] Daily reports sent.")
\ No newline at end of file
+    emails = [email for _, email in recipients if email]
+    results = await asyncio.gather(*(send(email) for email in emails), return_exceptions=True)
+    failed = [(email, r) for email, r in zip(emails, results) if isinstance(r, Exception)]
+    for email, error in failed:
+        print(f"[!] Daily report to {email} failed: {error}")
+
+    print(f"[+] Daily reports sent: {len(emails) - len(failed)}/{len(emails)}.")
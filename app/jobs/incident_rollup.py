@@ -0,0 +1,13 @@
+import os
+from datetime import datetime, timedelta
+
+from app.db.database import SessionLocal
+from app.services.incident_rollup import reconcile
+
+
+async def reconcile_incident_stats():
+    """Сверка incident_daily_stats с incidents за последние INCIDENT_ROLLUP_RECONCILE_DAYS дней."""
+    days = int(os.getenv("INCIDENT_ROLLUP_RECONCILE_DAYS", "90"))
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+    async with SessionLocal() as db:
+        await reconcile(db, since)
@@ -0,0 +1,51 @@
+"""Перенос содержимого report_archive.content в blob store.
+
+    python -m app.jobs.report_blob_migration
+
+Идёт пачками по REPORT_BLOB_MIGRATION_BATCH строк, каждая пачка — своя
+транзакция; повторный запуск продолжает с того места, где остановился.
+"""
+import asyncio
+import os
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app.db.database import SessionLocal
+from app.models.report import ReportArchive
+from app.services.blob_store import get_blob_store
+
+
+async def migrate_report_blobs() -> int:
+    batch = int(os.getenv("REPORT_BLOB_MIGRATION_BATCH", "50"))
+    store = get_blob_store()
+    moved = 0
+
+    while True:
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(ReportArchive.id, ReportArchive.content)
+                .where(ReportArchive.content_sha256.is_(None), ReportArchive.content.isnot(None))
+                .order_by(ReportArchive.id)
+                .limit(batch)
+            )).all()
+            if not rows:
+                break
+
+            for row_id, content in rows:
+                key = await store.put(content)
+                await db.execute(
+                    update(ReportArchive)
+                    .where(ReportArchive.id == row_id)
+                    .values(content_sha256=key, size=len(content), content=None)
+                )
+            await db.commit()
+            moved += len(rows)
+            print(f"[*] Moved {moved} archived reports to blob store...")
+
+    print(f"[+] Report blob migration done: {moved} rows moved.")
+    return moved
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_report_blobs())
@@ -0,0 +1,13 @@
+from app.db.database import SessionLocal
+from app.services.retention import SweepStats, sweep_orphan_attachments, sweep_reports
+
+
+async def run_retention_sweep() -> SweepStats:
+    """Старые отчёты + их blob-ы, затем осиротевшие файлы вложений."""
+    print("[*] Running retention sweep...")
+    stats = SweepStats()
+    async with SessionLocal() as db:
+        await sweep_reports(db, stats=stats)
+        await sweep_orphan_attachments(db, stats=stats)
+    print(f"[+] Retention sweep done: {stats}.")
+    return stats
@@ -2,6 +2,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.jobs.daily_report import generate_daily_reports
 from app.jobs.ticket_sla import check_ticket_sla
+from app.jobs.incident_rollup import reconcile_incident_stats
+from app.jobs.retention import run_retention_sweep
+from app.jobs.audit_partitions import maintain_audit_partitions
 
 def start_scheduler():
     scheduler = AsyncIOScheduler()
@@ -15,4 +18,21 @@ def start_scheduler():
         CronTrigger(hour="*", minute=0),  # проверка каждый час, в начале часа
        id="ticket_sla_breach"
     )
+    scheduler.add_job(
+        reconcile_incident_stats,
+        CronTrigger(hour="*", minute=30),  # раз в час сверяем агрегаты с incidents
+        id="incident_rollup_reconcile"
+    )
+    scheduler.add_job(
+        run_retention_sweep,
+        CronTrigger(hour=3, minute=15),  # ночью, вне пиковой нагрузки
+        id="retention_sweep",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        maintain_audit_partitions,
+        CronTrigger(hour=0, minute=5),  # секции audit_logs на следующие месяцы + удаление старых
+        id="audit_partitions"
+    )
     scheduler.start()
\ No newline at end of file
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import SessionLocal
 from app.models.ticket import Ticket, TicketStatus
 from app.models.ticket_message import TicketMessage
-from app.services.notify import send_notification_event
+from app.services.notify import enqueue_notification
 
 async def check_ticket_sla():
     """Проверка тикетов без ответа аналитика в SLA_TICKET_FIRST_HOURS."""
@@ -33,7 +33,10 @@ async def check_ticket_sla():
 
             if not first_analyst:
                 # Шлём всем подписанным напоминание о SLA-нарушении
-                await send_notification_event(
+                enqueue_notification(
+                    db,
                     "ticket_sla_breach",
                     f"Ticket #{ticket.id} не получил ответа аналитика в течение {hours} ч."
                 )
+
+        await db.commit()
@@ -1,45 +1,74 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from app.db.database import SessionLocal
-from app.models.audit_log import AuditLog
-from sqlalchemy.future import select
-from app.models.user import User
 import datetime
+
 from jose import jwt as _jose_jwt
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from app.core.config import settings as _settings
+from app.middleware.scope import header
+from app.services.audit_writer import audit_writer
+from app.services.user_cache import user_cache
+
+AUDITED_METHODS = ("POST", "PUT", "DELETE", "PATCH")
+
+
+def _user_id(scope: Scope):
+    """Пользователь запроса без обращения к БД.
+
+    Если эндпоинт проходил get_auth_context, контекст уже лежит в
+    request.state.auth (scope["state"]); иначе пробуем cookie-токен + кэш пользователей.
+    """
+    ctx = scope.get("state", {}).get("auth")
+    if ctx is not None:
+        return ctx.user.id
+    try:
+        cookie = header(scope, b"cookie")
+        cookie_token = cookie_parser(cookie).get("access_token") if cookie else None
+        if cookie_token:
+            payload = _jose_jwt.decode(cookie_token, _settings.SECRET_KEY, algorithms=[_settings.ALGORITHM])
+            user = user_cache.get(payload.get("sub") or "")
+            if user is not None:
+                return user.id
+    except Exception:
+        pass
+    return None
+
+
+class AuditMiddleware:
+    """Аудит изменяющих запросов (чистый ASGI, тело ответа не буферизуется)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in AUDITED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        user = None
+        error = None
         try:
-            # Пытаемся восстановить пользователя из cookie-токена (локальная сессия)
-            cookie_token = request.cookies.get("access_token")
-            if cookie_token:
-                payload = _jose_jwt.decode(cookie_token, _settings.SECRET_KEY, algorithms=[_settings.ALGORITHM])
-                email = payload.get("sub")
-                if email:
-                    async with SessionLocal() as db:
-                        res = await db.execute(select(User).where(User.email == email))
-                        user = res.scalar_one_or_none()
-        except Exception:
-            user = None
-
-        response = await call_next(request)
-
-        # Логируем только значимые методы
-        if request.method in ("POST", "PUT", "DELETE", "PATCH"):
-            async with SessionLocal() as db:
-                log = AuditLog(
-                    user_id=getattr(user, "id", None),
-                    path=str(request.url.path),
-                    method=request.method,
-                    status_code=response.status_code,
-                    timestamp=datetime.datetime.utcnow(),
-                    user_agent=request.headers.get("user-agent"),
-                    ip=request.client.host if request.client else None,
-                    error=None,
-                )
-                db.add(log)
-                await db.commit()
-        return response
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            # Запись в БД — фоном, пачками
+            client = scope.get("client")
+            await audit_writer.submit({
+                "user_id": _user_id(scope),
+                "path": scope["path"],
+                "method": scope["method"],
+                "status_code": status_code,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc),
+                "user_agent": header(scope, b"user-agent"),
+                "ip": client[0] if client else None,
+                "error": error,
+            })
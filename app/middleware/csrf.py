@@ -0,0 +1,90 @@
+import hashlib
+import hmac
+import secrets
+
+from starlette.requests import cookie_parser
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings as _settings
+from app.middleware.scope import header
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class CSRFMiddleware:
+    """Double Submit Cookie CSRF защита для cookie-потока (чистый ASGI).
+
+    Требует заголовок X-CSRF-Token для небезопасных методов, если не используется Bearer.
+    Токен = nonce, а подпись хранится в cookie: csrf_token = nonce.signature
+    """
+
+    COOKIE_NAME = "csrf_token"
+    HEADER_NAME = "X-CSRF-Token"
+    EXEMPT_PATHS = {"/auth/login", "/auth/register"}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._header_name = self.HEADER_NAME.lower().encode("latin-1")
+
+    def _sign(self, nonce: str) -> str:
+        sig = hmac.new(_settings.CSRF_SECRET.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+        return f"{nonce}.{sig}"
+
+    def _verify(self, value: str, presented: str) -> bool:
+        try:
+            nonce, sig = value.split(".", 1)
+        except ValueError:
+            return False
+        calc = hmac.new(_settings.CSRF_SECRET.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(sig, calc):
+            return False
+        return hmac.compare_digest(nonce, presented)
+
+    def _cookie_header(self, value: str) -> tuple[bytes, bytes]:
+        # set-cookie собираем так же, как Response.set_cookie
+        response = Response()
+        response.set_cookie(
+            self.COOKIE_NAME,
+            value,
+            httponly=False,
+            secure=_settings.COOKIE_SECURE,
+            samesite=_settings.COOKIE_SAMESITE,
+            path="/",
+            max_age=60 * 60 * 24,
+        )
+        return next(h for h in response.raw_headers if h[0] == b"set-cookie")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        cookie = header(scope, b"cookie")
+        csrf_cookie = cookie_parser(cookie).get(self.COOKIE_NAME) if cookie else None
+
+        # Выдаём токен, если отсутствует, на безопасные методы
+        if method in SAFE_METHODS and not csrf_cookie:
+            set_cookie = self._cookie_header(self._sign(secrets.token_urlsafe(32)))
+
+            async def send_with_cookie(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [set_cookie]
+                await send(message)
+
+            await self.app(scope, receive, send_with_cookie)
+            return
+
+        # Для небезопасных методов — проверка, если не Bearer (логин/регистрация — исключения)
+        if method in UNSAFE_METHODS and scope["path"] not in self.EXEMPT_PATHS:
+            auth = header(scope, b"authorization") or ""
+            if not auth.lower().startswith("bearer "):
+                presented = header(scope, self._header_name)
+                if not (csrf_cookie and presented and self._verify(csrf_cookie, presented)):
+                    response = Response("CSRF token missing or invalid", status_code=403)
+                    await response(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
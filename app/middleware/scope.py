@@ -0,0 +1,26 @@
+"""Чтение заголовков прямо из ASGI scope (для чистых ASGI middleware)."""
+from typing import Optional
+
+from starlette.types import Scope
+
+
+def raw_header(scope: Scope, name: bytes) -> Optional[bytes]:
+    """Первое значение заголовка; name — в нижнем регистре, как в scope."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def header(scope: Scope, name: bytes) -> Optional[str]:
+    value = raw_header(scope, name)
+    return value.decode("latin-1") if value is not None else None
+
+
+def host(scope: Scope) -> bytes:
+    """Значение Host (с портом), иначе адрес сервера из scope."""
+    value = raw_header(scope, b"host")
+    if value is not None:
+        return value
+    server = scope.get("server")
+    return server[0].encode("latin-1") if server else b""
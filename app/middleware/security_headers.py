@@ -0,0 +1,42 @@
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import Settings, settings as _settings
+from app.middleware.scope import host
+from app.security.headers import DEFAULT, DOCS, DOCS_PREFIXES, STATE_KEY, HeaderProfiles
+
+
+class SecurityHeadersMiddleware:
+    """Базовые заголовки безопасности + CSP (чистый ASGI).
+
+    Профиль берётся из request.state (см. app.security.headers.header_profile),
+    для /docs|/redoc — "docs", иначе "default". На ответ добавляются только
+    заголовки, которых ещё нет.
+    """
+
+    def __init__(self, app: ASGIApp, cfg: Optional[Settings] = None):
+        self.app = app
+        self.profiles = HeaderProfiles(cfg or _settings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        host_class = self.profiles.host_class(host(scope))
+        fallback = DOCS if scope["path"].startswith(DOCS_PREFIXES) else DEFAULT
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # маршрут (если дошли до него) уже записал выбор в scope["state"]
+                profile = scope.get("state", {}).get(STATE_KEY, fallback)
+                extra = self.profiles.get(host_class, profile)
+                raw = message.setdefault("headers", [])
+                if not isinstance(raw, list):
+                    raw = message["headers"] = list(raw)
+                present = {k.lower() for k, _ in raw}
+                raw.extend(h for h in extra if h[0] not in present)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
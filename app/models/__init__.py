@@ -1,9 +1,13 @@
 from .user import User
 from .incident import Incident
 from .incident_history import IncidentHistory
+from .audit_log import AuditLog
+from .incident_daily_stats import IncidentDailyStats
 from .message import Message
 from .attachment import Attachment
 from .notification import Notification
+from .notification_outbox import NotificationOutbox
+from .notification_dead_letter import NotificationDeadLetter
 from .report import ReportArchive
 from .knowledge_article import KnowledgeArticle
 from .ticket import Ticket
@@ -13,9 +17,13 @@ __all__ = [
     "User",
     "Incident",
     "IncidentHistory",
+    "AuditLog",
+    "IncidentDailyStats",
     "Message",
     "Attachment",
     "Notification",
+    "NotificationOutbox",
+    "NotificationDeadLetter",
     "ReportArchive",
     "KnowledgeArticle",
     "Ticket",
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, ForeignKey, Identity, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class AuditLog(Base):
+    """Мутирующие запросы к API; пишет AuditMiddleware через app/services/audit_writer.py.
+
+    Таблица секционирована по месяцам (RANGE по timestamp), поэтому timestamp
+    входит в первичный ключ. Секции создаёт и удаляет
+    app/services/audit_partitions.py (джоба в планировщике).
+    """
+    __tablename__ = "audit_logs"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    path = Column(String, nullable=False)
+    method = Column(String(10), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    user_agent = Column(String, nullable=True)
+    ip = Column(String(45), nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # keyset-пагинация /api/secure/audit: ORDER BY timestamp DESC, id DESC
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_audit_logs_path_timestamp", "path", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -7,10 +8,19 @@ class Incident(Base):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    description = Column(Text)
+    # тяжёлые колонки грузим только по запросу: undefer(...) там, где их отдают
+    description = deferred(Column(Text))
     status = Column(String, default="open")  
     priority = Column(String, default="medium")  
     client_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     first_response_at = Column(DateTime(timezone=True), nullable=True)
-    closed_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # keyset-пагинация /api/incidents/my: ORDER BY created_at DESC, id DESC
+        Index("ix_incidents_created_at_id", "created_at", "id"),
+        Index("ix_incidents_client_id_created_at_id", "client_id", "created_at", "id"),
+        Index("ix_incidents_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_incidents_priority_created_at_id", "priority", "created_at", "id"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Date, Float
+from app.db.base import Base
+
+
+class IncidentDailyStats(Base):
+    """Материализованные агрегаты по инцидентам: день создания x клиент x приоритет x статус.
+
+    Поддерживается инкрементально (app/services/incident_rollup.py) и
+    периодически сверяется с incidents джобой reconcile_incident_stats.
+    """
+    __tablename__ = "incident_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    client_id = Column(Integer, primary_key=True, default=0)   # 0 — клиент не указан
+    priority = Column(String, primary_key=True, default="")
+    status = Column(String, primary_key=True, default="")
+    incidents = Column(Integer, nullable=False, default=0)
+    # суммы в минутах + количество, чтобы считать средние без сырых строк
+    response_minutes = Column(Float, nullable=False, default=0)
+    responded = Column(Integer, nullable=False, default=0)
+    resolution_minutes = Column(Float, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -9,6 +10,6 @@ class Message(Base):
     incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     sender_role = Column(String, nullable=False) 
-    text = Column(Text, nullable=False)
+    text = deferred(Column(Text, nullable=False))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     attachment = Column(String, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Enum, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 import enum
@@ -17,4 +17,13 @@ class Notification(Base):
     target = Column(String, nullable=False)  
     event = Column(String, nullable=False)  
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # None — значения по умолчанию из app/services/notify_throttle.py
+    rate_limit_per_minute = Column(Integer, nullable=True)
+    # > 0 — события копятся и уходят одним сообщением раз в окно
+    digest_window_seconds = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # выборка подписок на событие (загрузка таблицы маршрутов рассылки)
+        Index("ix_notifications_event_is_active", "event", "is_active"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class NotificationDeadLetter(Base):
+    """Сообщение, от доставки которого отказались (ретраи исчерпаны или цель отключена breaker-ом)."""
+    __tablename__ = "notification_dead_letters"
+
+    id = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, nullable=True)   # notifications.id; подписку могли удалить
+    channel = Column(String, nullable=False)
+    target = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    replayed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_dead_letters_created_at_id", "created_at", "id"),
+        Index("ix_notification_dead_letters_target", "channel", "target"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class NotificationOutbox(Base):
+    """Событие для рассылки, записанное в той же транзакции, что и изменение.
+
+    Строку забирает воркер app/services/outbox.py: available_at сдвигается на
+    время аренды, после доставки строка удаляется. Строка события
+    (subscription_id пуст) раскладывается на строки по подпискам, и каждая
+    доставляется и повторяется отдельно.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True)
+    event = Column(String, nullable=False)
+    # notifications.id; без FK — подписку могут удалить, пока строка ждёт повтора
+    subscription_id = Column(Integer, nullable=True)
+    message = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
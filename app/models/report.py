@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Enum, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.db.base import Base
 import enum
@@ -18,7 +18,11 @@ class ReportArchive(Base):
     filename = Column(String, nullable=False)
     format = Column(Enum(ReportFormat), nullable=False)
     generated_at = Column(DateTime, default=datetime.utcnow)
-    content = Column(LargeBinary, nullable=False)
+    # Содержимое лежит в blob store (app/services/blob_store.py) под ключом sha256.
+    # content — только у старых строк, ещё не перенесённых migrate_report_blobs.
+    content = deferred(Column(LargeBinary, nullable=True))
+    content_sha256 = Column(String(64), nullable=True, index=True)
+    size = Column(Integer, nullable=True)
 
     generated_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     generated_by = relationship("User", back_populates="reports")
\ No newline at end of file
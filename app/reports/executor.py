@@ -0,0 +1,176 @@
+"""Рендер отчётов (reportlab/openpyxl) вне event loop — в пуле процессов.
+
+generate_pdf / generate_excel — чистый CPU; вызванные прямо из async-хэндлера
+они останавливают весь воркер. Здесь они уходят в ProcessPoolExecutor с
+ограничением параллелизма и таймаутом.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+# Сколько рендеров одновременно может ждать/выполняться; остальные ждут очереди
+REPORT_RENDER_CONCURRENCY = int(os.getenv("REPORT_RENDER_CONCURRENCY", str(REPORT_RENDER_WORKERS * 2)))
+REPORT_RENDER_TIMEOUT = float(os.getenv("REPORT_RENDER_TIMEOUT", "120"))
+
+
+class ReportRenderTimeout(Exception):
+    """Рендер не уложился в REPORT_RENDER_TIMEOUT."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+# незавершённые задачи по пулам и те из них, что брошены по таймауту
+_jobs: dict[ProcessPoolExecutor, set[Future]] = {}
+_abandoned: dict[ProcessPoolExecutor, set[Future]] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None or getattr(_pool, "_broken", False):
+        # spawn: не тащим в дочерние процессы состояние event loop и пулов БД
+        _pool = ProcessPoolExecutor(
+            max_workers=REPORT_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(REPORT_RENDER_CONCURRENCY)
+    return _slots
+
+
+def _retire(pool: ProcessPoolExecutor, job: Future) -> None:
+    """Зависший рендер нельзя отменить. Пул выводим из оборота (новые задачи
+    пойдут в свежий), а его процессы убиваем, только когда в нём не осталось
+    живых задач: остальные рендеры этого пула спокойно доделываются."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    _abandoned.setdefault(pool, set()).add(job)
+    _reap(pool)
+
+
+def _reap(pool: ProcessPoolExecutor) -> None:
+    abandoned = _abandoned.get(pool)
+    if not abandoned or not _jobs.get(pool, set()) <= abandoned:
+        return
+    del _abandoned[pool]
+    _jobs.pop(pool, None)
+    _kill(pool)
+
+
+def _kill(pool: ProcessPoolExecutor) -> None:
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _finished(pool: ProcessPoolExecutor, job: Future, slots: asyncio.Semaphore) -> None:
+    slots.release()
+    jobs = _jobs.get(pool)
+    if jobs is not None:
+        jobs.discard(job)
+        if not jobs:
+            del _jobs[pool]
+    if pool in _abandoned:
+        _reap(pool)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _render_to_path(fn: Callable[..., bytes], args: tuple, kwargs: dict, path: str) -> str:
+    """Выполняется в дочернем процессе: результат пишем в файл, по пайпу идёт только путь."""
+    with open(path, "wb") as f:
+        f.write(fn(*args, **kwargs))
+    return path
+
+
+async def _submit(fn: Callable, *args: Any, on_abandon: Optional[Callable[[], None]] = None) -> Any:
+    slots = _get_slots()
+    await slots.acquire()  # очередь за слотом в таймаут рендера не входит
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        job = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    _jobs.setdefault(pool, set()).add(job)
+
+    abandoned = False
+
+    def _done(_):
+        # слот занят, пока задача реально не завершилась в процессе
+        try:
+            loop.call_soon_threadsafe(_finished, pool, job, slots)
+        except RuntimeError:
+            pass  # event loop уже закрыт (остановка приложения)
+        if abandoned and on_abandon is not None:
+            on_abandon()
+
+    job.add_done_callback(_done)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(job), timeout=REPORT_RENDER_TIMEOUT)
+    except asyncio.TimeoutError:
+        abandoned = True
+        logger.error(f"Report rendering via {getattr(fn, '__name__', fn)} timed out, retiring its render worker pool")
+        _retire(pool, job)
+        raise ReportRenderTimeout(f"Report rendering exceeded {REPORT_RENDER_TIMEOUT:.0f}s")
+    except BaseException:
+        abandoned = True
+        if job.done() and on_abandon is not None:
+            on_abandon()
+        raise
+
+
+async def render(fn: Callable[..., bytes], *args: Any, **kwargs: Any) -> bytes:
+    """Выполнить генератор отчёта в пуле процессов и вернуть bytes."""
+    if kwargs:
+        return await _submit(_call_with_kwargs, fn, args, kwargs)
+    return await _submit(fn, *args)
+
+
+async def render_to_file(fn: Callable[..., bytes], *args: Any, suffix: str = "", **kwargs: Any) -> str:
+    """То же, но результат остаётся во временном файле; вызывающий удаляет его сам.
+
+    Файл создаёт родитель: при ошибке/таймауте/отмене он удаляется здесь же,
+    а если рендер допишет его позже — из колбэка завершения задачи.
+    """
+    fd, path = tempfile.mkstemp(prefix="report_", suffix=suffix)
+    os.close(fd)
+    try:
+        return await _submit(_render_to_path, fn, args, kwargs, path, on_abandon=lambda: _unlink(path))
+    except BaseException:
+        _unlink(path)
+        raise
+
+
+def _call_with_kwargs(fn: Callable[..., bytes], args: tuple, kwargs: dict) -> bytes:
+    return fn(*args, **kwargs)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    # выведенные из оборота пулы с зависшими рендерами иначе держали бы выход процесса
+    for pool in list(_abandoned):
+        _kill(pool)
+    _abandoned.clear()
+    _jobs.clear()
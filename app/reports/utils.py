@@ -2,6 +2,7 @@ import io
 import os
 import csv
 from datetime import datetime, date
+from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from openpyxl import Workbook
@@ -13,13 +14,22 @@ from reportlab.lib import colors
 
 from app.models.incident import Incident
 
-async def fetch_incidents_by_date(db: AsyncSession, start_date: date, end_date: date) -> list[dict]:
-    stmt = select(Incident).where(
+CSV_FIELDS = ["id", "title", "status", "priority", "created_at"]
+
+
+def _in_range(start_date: date, end_date: date):
+    return (
         Incident.created_at >= datetime.combine(start_date, datetime.min.time()),
-        Incident.created_at <= datetime.combine(end_date, datetime.max.time())
+        Incident.created_at <= datetime.combine(end_date, datetime.max.time()),
     )
+
+
+async def fetch_incidents_by_date(db: AsyncSession, start_date: date, end_date: date) -> list[dict]:
+    stmt = select(
+        Incident.id, Incident.title, Incident.status, Incident.priority, Incident.created_at
+    ).where(*_in_range(start_date, end_date))
     result = await db.execute(stmt)
-    incidents = result.scalars().all()
+    incidents = result.all()
 
     return [{
         "id": i.id,
@@ -88,9 +98,38 @@ def generate_pdf(data: list[dict], username: str = "User") -> bytes:
     buffer.seek(0)
     return buffer.read()
 
+async def stream_csv(
+    db: AsyncSession, start_date: date, end_date: date, chunk_rows: int = 1000
+) -> AsyncIterator[bytes]:
+    """CSV по инцидентам периода, порциями по chunk_rows строк.
+
+    Строки читаются серверным курсором (stream + yield_per), поэтому память
+    не зависит от размера периода.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+
+    stmt = (
+        select(Incident.id, Incident.title, Incident.status, Incident.priority, Incident.created_at)
+        .where(*_in_range(start_date, end_date))
+        .order_by(Incident.created_at, Incident.id)
+        .execution_options(yield_per=chunk_rows)
+    )
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        for row in rows:
+            writer.writerow([row.id, row.title, row.status, row.priority, row.created_at.strftime("%Y-%m-%d %H:%M")])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
 def generate_csv(data: list[dict]) -> bytes:
     buffer = io.StringIO()
-    writer = csv.DictWriter(buffer, fieldnames=["id", "title", "status", "priority", "created_at"])
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
     writer.writeheader()
     writer.writerows(data)
     return buffer.getvalue().encode("utf-8")
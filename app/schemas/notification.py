@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from datetime import datetime
+from typing import Optional
 
 class NotificationChannel(str, Enum):
     email = "email"
@@ -11,6 +12,8 @@ class NotificationCreate(BaseModel):
     channel: NotificationChannel
     target: str
     event: str
+    rate_limit_per_minute: Optional[int] = Field(None, ge=1)
+    digest_window_seconds: Optional[int] = Field(None, ge=1)
 
 class NotificationOut(BaseModel):
     id: int
@@ -19,6 +22,8 @@ class NotificationOut(BaseModel):
     target: str
     event: str
     is_active: bool
+    rate_limit_per_minute: Optional[int] = None
+    digest_window_seconds: Optional[int] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)  
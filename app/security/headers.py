@@ -0,0 +1,101 @@
+from types import MappingProxyType
+from typing import Mapping
+
+from fastapi import Request
+
+from app.core.config import Settings, settings as _settings
+
+RawHeaders = tuple[tuple[bytes, bytes], ...]
+
+LOCAL = "local"
+PUBLIC = "public"
+HOST_CLASSES = (LOCAL, PUBLIC)
+
+DEFAULT = "default"
+DOCS = "docs"
+DOWNLOAD = "download"
+PROFILES = (DEFAULT, DOCS, DOWNLOAD)
+
+DOCS_PREFIXES = ("/docs", "/redoc")
+
+# ключ в request.state (scope["state"]), через который маршрут выбирает профиль
+STATE_KEY = "header_profile"
+
+_BASE = (
+    ("x-content-type-options", "nosniff"),
+    ("x-frame-options", "DENY"),
+    ("referrer-policy", "strict-origin-when-cross-origin"),
+    ("permissions-policy", "geolocation=(), microphone=(), camera=()"),
+)
+
+
+def _csp(host_class: str, profile: str, cfg: Settings) -> str:
+    if profile == DOWNLOAD:
+        # пользовательские файлы: ничего не исполняем, даже если браузер откроет их inline
+        return "default-src 'none'; frame-ancestors 'none'; sandbox"
+    # CSP: ослабляем для /docs|/redoc (Swagger/Redoc тянут ресурсы с CDN)
+    cdn = f" {cfg.CSP_DOCS_CDN}" if profile == DOCS and cfg.CSP_DOCS_CDN else ""
+    if host_class == LOCAL:
+        connect = " ".join(["'self'", *cfg.CSP_DEV_CONNECT_SRC])
+        return (
+            "default-src 'self'; "
+            "img-src 'self' data: blob: https:; "
+            f"style-src 'self' 'unsafe-inline'{cdn}; "
+            f"script-src 'self' 'unsafe-eval' 'unsafe-inline'{cdn}; "
+            f"connect-src {connect}; "
+            "frame-ancestors 'none'"
+        )
+    return (
+        "default-src 'self'; "
+        "img-src 'self' data: https:; "
+        f"style-src 'self' 'unsafe-inline'{cdn}; "
+        f"script-src 'self'{cdn}; "
+        "connect-src 'self'; "
+        "frame-ancestors 'none'"
+    )
+
+
+class HeaderProfiles:
+    """Реестр готовых наборов заголовков безопасности.
+
+    Для каждой пары (класс хоста, профиль) заголовки собираются один раз из
+    настроек и хранятся как неизменяемые кортежи сырых (bytes) пар — на запрос
+    остаётся только выбрать нужный кортеж.
+    """
+
+    def __init__(self, cfg: Settings = _settings):
+        self.local_hosts = frozenset(h.lower().encode("latin-1") for h in cfg.SECURITY_LOCAL_HOSTS)
+        self._profiles: Mapping[tuple[str, str], RawHeaders] = MappingProxyType({
+            (host_class, profile): tuple(
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in (*_BASE, ("content-security-policy", _csp(host_class, profile, cfg)))
+            )
+            for host_class in HOST_CLASSES
+            for profile in PROFILES
+        })
+
+    def host_class(self, host: bytes) -> str:
+        """Класс хоста по значению заголовка Host (порт отбрасывается)."""
+        host = host.lower()
+        if host.startswith(b"["):
+            host = host[1:host.find(b"]")]
+        else:
+            host = host.partition(b":")[0]
+        return LOCAL if host in self.local_hosts else PUBLIC
+
+    def get(self, host_class: str, profile: str) -> RawHeaders:
+        return self._profiles[(host_class, profile)]
+
+
+def header_profile(profile: str):
+    """Зависимость маршрута: выбрать профиль заголовков безопасности.
+
+    @router.get("/...", dependencies=[Depends(header_profile(DOWNLOAD))])
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown header profile: {profile}")
+
+    def _select(request: Request) -> None:
+        setattr(request.state, STATE_KEY, profile)
+
+    return _select
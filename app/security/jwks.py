@@ -0,0 +1,151 @@
+import time
+import asyncio
+import logging
+import re
+from typing import Any, Optional
+
+import httpx
+from jwt import PyJWK
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSError(Exception):
+    """Ключ для токена не найден и получить его не удалось."""
+
+
+class JWKSManager:
+    """Асинхронный кэш JWKS Keycloak.
+
+    - один общий httpx.AsyncClient на процесс;
+    - фоновое обновление набора ключей до истечения TTL;
+    - неизвестный kid -> один запрос, все конкурентные ожидающие делят его;
+    - если Keycloak недоступен — продолжаем отдавать последние известные ключи.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 300.0,
+        min_refetch_interval: float = 10.0,
+        timeout: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._client = client
+        self._owns_client = client is None
+        self._keys: dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_attempt = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    # ---------- lifecycle ----------
+    async def start(self) -> None:
+        """Первичная загрузка ключей и запуск фонового обновления."""
+        try:
+            await self.refresh()
+        except JWKSError as e:
+            # Не валим старт приложения — ключи подтянутся позже
+            logger.warning(f"Initial JWKS fetch failed: {e}")
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- public ----------
+    async def get_key(self, kid: Optional[str]) -> Any:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        # kid-miss: перезапрашиваем, но не чаще min_refetch_interval,
+        # иначе мусорные kid превратятся в DoS на Keycloak
+        if self._inflight is not None or not self._keys or (
+            time.monotonic() - self._last_attempt >= self.min_refetch_interval
+        ):
+            try:
+                await self.refresh()
+            except JWKSError as e:
+                logger.warning(f"JWKS refresh on kid miss failed: {e}")
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWKSError(f"Signing key '{kid}' not found")
+        return key
+
+    async def refresh(self) -> None:
+        """Обновить ключи; конкурентные вызовы ждут один и тот же запрос."""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        await asyncio.shield(self._inflight)
+
+    # ---------- internals ----------
+    def _clear_inflight(self, task: asyncio.Task) -> None:
+        if self._inflight is task:
+            self._inflight = None
+        if not task.cancelled():
+            task.exception()  # не даём asyncio ругаться на "never retrieved"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._owns_client = True
+        return self._client
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        try:
+            response = await self._get_client().get(self.url)
+            response.raise_for_status()
+            jwks = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise JWKSError(f"JWKS fetch failed: {e}") from e
+
+        keys: dict[str, Any] = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[jwk.get("kid")] = PyJWK(jwk).key
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWK {jwk.get('kid')}: {e}")
+        if not keys:
+            raise JWKSError("JWKS response contains no signing keys")
+
+        self._keys = keys
+        self._expires_at = time.monotonic() + self._ttl_from(response)
+
+    def _ttl_from(self, response: httpx.Response) -> float:
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        if match and int(match.group(1)) > 0:
+            return float(match.group(1))
+        return self.ttl
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # обновляем заранее — на 80% TTL; при ошибке повторяем чаще
+            delay = max((self._expires_at - time.monotonic()) * 0.8, self.min_refetch_interval)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except JWKSError as e:
+                logger.warning(f"Background JWKS refresh failed, keeping last-known keys: {e}")
+            except Exception:
+                logger.exception("Unexpected error during JWKS refresh")
@@ -1,8 +1,13 @@
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from functools import lru_cache
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request
 import jwt
-from jwt import PyJWKClient
+
+from app.security.jwks import JWKSManager
 
 KC_BASE = os.getenv("KC_BASE_URL", "http://keycloak:8080")
 KC_REALM = os.getenv("KC_REALM", "soc")
@@ -10,16 +15,77 @@ KC_CLIENT_ID = os.getenv("KC_CLIENT_ID", "soc-portal")
 # Пусто = не проверяем audience. Если хочешь строго — поставь clientId.
 KC_AUDIENCE = os.getenv("KC_AUDIENCE", "")
 ALGO = "RS256"
+# Сколько проверенных токенов держим в памяти процесса (0 = кэш выключен)
+KC_TOKEN_CACHE_SIZE = int(os.getenv("KC_TOKEN_CACHE_SIZE", "4096"))
+# TTL набора ключей, если Keycloak не прислал Cache-Control: max-age
+KC_JWKS_TTL = float(os.getenv("KC_JWKS_TTL", "300"))
+KC_JWKS_MIN_REFETCH = float(os.getenv("KC_JWKS_MIN_REFETCH", "10"))
 
 JWKS_URL = f"{KC_BASE}/realms/{KC_REALM}/protocol/openid-connect/certs"
-_jwks_client = PyJWKClient(JWKS_URL)
+jwks_manager = JWKSManager(JWKS_URL, ttl=KC_JWKS_TTL, min_refetch_interval=KC_JWKS_MIN_REFETCH)
+
+
+class VerifiedTokenCache:
+    """LRU-кэш уже проверенных claims.
+
+    Ключ — sha256 от токена (сам токен в памяти не держим), запись живёт
+    до `exp` токена. Невалидные токены не кэшируются.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+        # на всякий случай: токен могут проверять и из threadpool
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            exp, claims = item
+            if exp <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._items[key] = (float(exp), claims)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_token_cache = VerifiedTokenCache(KC_TOKEN_CACHE_SIZE)
+
 
 def _issuer() -> str:
     return f"{KC_BASE}/realms/{KC_REALM}"
 
-def _decode(token: str) -> dict:
+async def _verify(token: str) -> dict:
     try:
-        signing_key = _jwks_client.get_signing_key_from_jwt(token).key
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await jwks_manager.get_key(kid)
         return jwt.decode(
             token,
             signing_key,
@@ -31,23 +97,27 @@ def _decode(token: str) -> dict:
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
 
+async def _decode(token: str) -> dict:
+    claims = _token_cache.get(token)
+    if claims is None:
+        claims = await _verify(token)
+        _token_cache.put(token, claims)
+    return claims
+
 def _bearer(auth: str | None) -> str:
     if not auth or not auth.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Authorization header missing")
     return auth.split(" ", 1)[1]
 
-def get_current_claims(authorization: str | None = Header(None)) -> dict:
+async def get_current_claims(request: Request, authorization: str | None = Header(None)) -> dict:
+    """Claims Bearer-токена; в рамках одного запроса токен проверяется один раз."""
     token = _bearer(authorization)
-    return _decode(token)
+    memo = getattr(request.state, "kc_claims", None)
+    if memo is not None and memo[0] == token:
+        return memo[1]
+    claims = await _decode(token)
+    request.state.kc_claims = (token, claims)
+    return claims
 
 def get_roles(claims: dict) -> list[str]:
     return claims.get("realm_access", {}).get("roles", []) or []
-
-def require_roles(*allowed: str):
-    def dep(authorization: str | None = Header(None)):
-        claims = get_current_claims(authorization)
-        roles = get_roles(claims)
-        if not any(r in roles for r in allowed):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        return claims
-    return dep
@@ -0,0 +1,89 @@
+"""Месячные секции audit_logs: создание наперёд и удаление старых.
+
+Секция audit_logs_yYYYYmMM покрывает [1-е число месяца, 1-е число следующего)
+в UTC. Вставка в месяц без секции падает, поэтому секции создаются на
+AUDIT_PARTITION_MONTHS_AHEAD месяцев вперёд — при старте приложения и
+ежедневно из планировщика. Секции старше AUDIT_RETENTION_MONTHS удаляются
+целиком (DETACH + DROP) вместо DELETE миллионов строк.
+"""
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "2"))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))
+
+PARENT = "audit_logs"
+_NAME_RE = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+
+def create_partition_sql(month: date) -> str:
+    start, end = month_start(month), add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def ensure_partitions(
+    db: AsyncSession, ahead: int = AUDIT_PARTITION_MONTHS_AHEAD, today: Optional[date] = None
+) -> list[str]:
+    """Секции на текущий месяц и `ahead` следующих."""
+    current = month_start(today or _today())
+    months = [add_months(current, i) for i in range(ahead + 1)]
+    for month in months:
+        await db.execute(text(create_partition_sql(month)))
+    await db.commit()
+    return [partition_name(m) for m in months]
+
+
+async def list_partitions(db: AsyncSession) -> list[tuple[str, date]]:
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT})
+    partitions = []
+    for (name,) in result.all():
+        m = _NAME_RE.match(name)
+        if m:
+            partitions.append((name, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def drop_old_partitions(
+    db: AsyncSession, retention_months: int = AUDIT_RETENTION_MONTHS, today: Optional[date] = None
+) -> list[str]:
+    """Удалить секции, целиком лежащие раньше, чем `retention_months` месяцев назад."""
+    cutoff = add_months(month_start(today or _today()), -retention_months)
+    dropped = []
+    for name, month in await list_partitions(db):
+        if month >= cutoff:
+            continue
+        # короткие транзакции: DETACH/DROP берут эксклюзивную блокировку
+        await db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        dropped.append(name)
+    return dropped
@@ -0,0 +1,145 @@
+"""Фоновая запись audit-событий пачками.
+
+AuditMiddleware кладёт событие в ограниченную очередь и не ждёт БД; фоновая
+задача забирает до AUDIT_BATCH_SIZE событий (или что накопилось за
+AUDIT_FLUSH_INTERVAL секунд) и пишет их одним многострочным INSERT.
+
+Если очередь полна, запрос ждёт место не дольше AUDIT_ENQUEUE_TIMEOUT_MS,
+после чего событие отбрасывается и учитывается в счётчике dropped.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import insert
+
+from app.db.database import SessionLocal
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT_MS", "5")) / 1000
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        maxsize: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT,
+    ):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: list[dict] = []
+        self._inflight: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        return self._queue
+
+    async def submit(self, record: dict) -> bool:
+        """Поставить событие в очередь; False — отброшено (очередь полна)."""
+        queue = self._get_queue()
+        try:
+            queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(queue.put(record), timeout=self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full, {self.dropped} events dropped so far")
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._get_queue()
+            self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self) -> None:
+        """Остановить фоновую задачу и дописать то, что осталось в очереди."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        # начатую запись не повторяем (она могла уже закоммитить пачку) — дожидаемся её
+        inflight, self._inflight = self._inflight, None
+        if inflight is not None:
+            await asyncio.gather(inflight, return_exceptions=True)
+        pending, self._pending = self._pending, []
+        await self._write(pending)
+        while self._queue is not None and not self._queue.empty():
+            await self._write(self._take(self.batch_size))
+
+    def _take(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _next_batch(self) -> list[dict]:
+        # собираем в self._pending, чтобы stop() не потерял уже вынутое из очереди
+        batch = self._pending = []
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            batch.extend(self._take(self.batch_size - len(batch)))
+            remaining = deadline - loop.time()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            async with SessionLocal() as db:
+                # список словарей -> один многострочный INSERT ... VALUES (...), (...)
+                await db.execute(insert(AuditLog), batch)
+                await db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} audit events: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            # пачка переходит от _pending к задаче записи без await между ними;
+            # shield: отмена _run (stop) не прерывает запись посередине
+            self._pending = []
+            self._inflight = asyncio.create_task(self._write(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+
+audit_writer = AuditWriter()
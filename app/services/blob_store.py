@@ -0,0 +1,171 @@
+"""Content-addressed хранилище файлов отчётов.
+
+Ключ файла — sha256 содержимого, поэтому одинаковые отчёты хранятся один раз.
+Бэкенд выбирается REPORT_STORE_BACKEND:
+  - local (по умолчанию) — каталог REPORT_STORE_DIR;
+  - s3 — любой S3-совместимый сервис (AWS, MinIO и т.п.), нужен boto3.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Сохранить содержимое (если его ещё нет) и вернуть ключ."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def iter_range(
+        self, key: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Байты [start, end] (end включительно) порциями по chunk_size."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # пишем во временный файл и атомарно переименовываем
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    async def put(self, data: bytes) -> str:
+        key = content_key(data)
+        await asyncio.to_thread(self._write, key, data)
+        return key
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    async def iter_range(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    """S3-совместимый бэкенд; endpoint_url позволяет подключить MinIO/локальную заглушку."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("REPORT_STORE_BACKEND=s3 requires boto3") from e
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = client
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            # botocore ClientError; код ошибки — в e.response
+            code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _put(self, key: str, data: bytes) -> None:
+        if not self._exists(key):
+            self._client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    async def put(self, data: bytes) -> str:
+        key = content_key(data)
+        await asyncio.to_thread(self._put, key, data)
+        return key
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    async def iter_range(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await asyncio.to_thread(
+            self._client.get_object, Bucket=self.bucket, Key=self._key(key), Range=byte_range
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=self._key(key))
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        backend = os.getenv("REPORT_STORE_BACKEND", "local").lower()
+        if backend == "s3":
+            _store = S3BlobStore(
+                bucket=os.environ["REPORT_S3_BUCKET"],
+                prefix=os.getenv("REPORT_S3_PREFIX", "reports/"),
+                endpoint_url=os.getenv("REPORT_S3_ENDPOINT_URL") or None,
+            )
+        else:
+            _store = LocalBlobStore(os.getenv("REPORT_STORE_DIR", "report_store"))
+    return _store
@@ -0,0 +1,91 @@
+"""Per-target circuit breakers for notification delivery.
+
+closed    — sends go through; NOTIFY_BREAKER_FAILURES consecutive failed
+            deliveries open the breaker;
+open      — sends are not attempted (CircuitOpenError; the outbox retries
+            the target later) until NOTIFY_BREAKER_RESET_SECONDS have passed;
+half_open — one probe delivery (single attempt, no retries) is let
+            through; success closes the breaker, failure opens it again.
+"""
+import os
+import time
+
+BREAKER_FAILURES = int(os.getenv("NOTIFY_BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("NOTIFY_BREAKER_RESET_SECONDS", "60"))
+
+class CircuitOpenError(Exception):
+    """Delivery to the target is suspended by its breaker."""
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    __slots__ = ("failure_threshold", "reset_timeout", "failures", "opened_at", "probing")
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """May a delivery be attempted now? In half-open only one probe at a time."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def release_probe(self) -> None:
+        """The probe ended without a result (e.g. cancelled): let the next send probe."""
+        self.probing = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+class BreakerRegistry:
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, channel: str, target: str) -> CircuitBreaker:
+        key = (channel, target)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def snapshot(self) -> list[dict]:
+        """Breakers that are not closed (for the admin endpoint)."""
+        return [
+            {"channel": channel, "target": target, "state": b.state, "failures": b.failures}
+            for (channel, target), b in self._breakers.items()
+            if b.state != CLOSED
+        ]
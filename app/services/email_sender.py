@@ -1,7 +1,8 @@
-import aiosmtplib
 from email.message import EmailMessage
 import os
 
+from app.services.smtp_pool import smtp_pool
+
 
 async def send_email_with_attachment(to_email: str, subject: str, body: str, filename: str, file_bytes: bytes, mime_type: str):
     message = EmailMessage()
@@ -17,12 +18,5 @@ async def send_email_with_attachment(to_email: str, subject: str, body: str, fil
         filename=filename,
     )
 
-    await aiosmtplib.send(
-        message,
-        hostname=os.getenv("SMTP_HOST"),
-        port=int(os.getenv("SMTP_PORT", 587)),
-        username=os.getenv("SMTP_USER"),
-        password=os.getenv("SMTP_PASS"),
-        use_tls=False,
-        start_tls=True,
-    )
\ No newline at end of file
+    # общий пул SMTP-сессий: без нового подключения/STARTTLS/AUTH на каждое письмо
+    await smtp_pool.send_message(message)
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Long-lived HTTP clients for outgoing notifications.
+
+One httpx.AsyncClient per target host (scheme://host:port), so every host gets
+its own keep-alive pool and connection cap and a slow webhook cannot occupy
+the connections of the others. HTTP/2 is enabled when the optional `h2`
+package is installed (pip install "httpx[http2]").
+
+Clients are created lazily on first send to a host and closed from the app
+shutdown hook.
+"""
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("NOTIFY_HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_MAX_KEEPALIVE_PER_HOST = int(os.getenv("NOTIFY_HTTP_MAX_KEEPALIVE_PER_HOST", "5"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("NOTIFY_HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("NOTIFY_HTTP_TIMEOUT", "30"))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientPool:
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive: int = HTTP_MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        timeout: float = HTTP_TIMEOUT,
+        http2: Optional[bool] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.http2 = _http2_available() if http2 is None else http2
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        u = httpx.URL(url)
+        return f"{u.scheme}://{u.host}:{u.port or (443 if u.scheme == 'https' else 80)}"
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Client for the host of `url` (created on first use)."""
+        origin = self._origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                headers={"User-Agent": "SOC-Portal/1.0"},
+            )
+            self._clients[origin] = client
+        return client
+
+    async def close(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+http_clients = HTTPClientPool()
@@ -0,0 +1,146 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, case, cast, delete, func, literal, literal_column, tuple_, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.incident import Incident
+from app.models.incident_daily_stats import IncidentDailyStats as Stats
+
+# Версия данных по инцидентам в этом процессе: меняется после каждого
+# закоммиченного изменения, ею ключуются кэши дашборда.
+_version = 0
+
+KEY_COLUMNS = ("day", "client_id", "priority", "status")
+# advisory-блокировка агрегатов одного дня, ключ (ROLLUP_LOCK_KEY, номер дня):
+# инкрементальные обновления берут её в shared режиме, reconcile — эксклюзивно
+# и только на время пересборки этого дня (обе — до конца транзакции)
+ROLLUP_LOCK_KEY = 7_020_001
+MEASURE_COLUMNS = ("incidents", "response_minutes", "responded", "resolution_minutes", "resolved")
+
+
+# Константы ключей — literal_column, а не bind-параметры: иначе Postgres не
+# сопоставит выражения в SELECT и GROUP BY ("must appear in the GROUP BY clause").
+def _day():
+    return cast(func.timezone(literal_column("'UTC'"), Incident.created_at), Date)
+
+
+def _day_number():
+    return _day() - literal_column("DATE '1970-01-01'")
+
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return Incident.created_at >= start, Incident.created_at < start + timedelta(days=1)
+
+
+def _keys():
+    return (
+        _day(),
+        func.coalesce(Incident.client_id, literal_column("0")),
+        func.coalesce(Incident.priority, literal_column("''")),
+        func.coalesce(Incident.status, literal_column("''")),
+    )
+
+
+def _measures():
+    """Вклад одной строки incidents в агрегаты (до умножения на знак)."""
+    response = func.extract("epoch", Incident.first_response_at - Incident.created_at) / 60
+    resolution = func.extract("epoch", Incident.closed_at - Incident.created_at) / 60
+    return (
+        literal(1),
+        func.coalesce(response, 0),
+        case((Incident.first_response_at.isnot(None), 1), else_=0),
+        func.coalesce(resolution, 0),
+        case((Incident.closed_at.isnot(None), 1), else_=0),
+    )
+
+
+def _upsert(source):
+    stmt = insert(Stats).from_select(KEY_COLUMNS + MEASURE_COLUMNS, source)
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={c: getattr(Stats, c) + getattr(stmt.excluded, c) for c in MEASURE_COLUMNS},
+    )
+
+
+def version() -> int:
+    return _version
+
+
+def mark_changed() -> None:
+    """Вызывать после commit изменения инцидента."""
+    global _version
+    _version += 1
+
+
+async def _apply(db: AsyncSession, incident_id: int, sign: int) -> None:
+    await db.execute(
+        select(func.pg_advisory_xact_lock_shared(ROLLUP_LOCK_KEY, _day_number()))
+        .where(Incident.id == incident_id)
+    )
+    source = select(*_keys(), *(m * sign for m in _measures())).where(Incident.id == incident_id)
+    await db.execute(_upsert(source))
+
+
+async def add_incident(db: AsyncSession, incident_id: int) -> None:
+    """Учесть текущее состояние инцидента (вызывать после flush, в той же транзакции)."""
+    await _apply(db, incident_id, 1)
+
+
+async def remove_incident(db: AsyncSession, incident_id: int) -> None:
+    """Снять вклад инцидента перед изменением статуса/приоритета/closed_at.
+
+    Строку инцидента вызывающий должен держать под FOR UPDATE с момента
+    проверки статуса: иначе два параллельных изменения снимут один и тот же
+    вклад дважды.
+    """
+    await _apply(db, incident_id, -1)
+
+
+async def _reconcile_day(db: AsyncSession, day: date) -> None:
+    await db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_KEY, (day - date(1970, 1, 1)).days)))
+    in_day = _day_bounds(day)
+
+    source = select(*_keys(), *(func.sum(m) for m in _measures())).where(*in_day).group_by(*_keys())
+    stmt = insert(Stats).from_select(KEY_COLUMNS + MEASURE_COLUMNS, source)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={c: getattr(stmt.excluded, c) for c in MEASURE_COLUMNS},
+    ))
+    # ключи этого дня, для которых инцидентов больше нет
+    live_keys = select(*_keys()).where(*in_day).group_by(*_keys())
+    await db.execute(
+        delete(Stats)
+        .where(Stats.day == day)
+        .where(tuple_(*(getattr(Stats, c) for c in KEY_COLUMNS)).not_in(live_keys))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def reconcile(db: AsyncSession, since: Optional[date] = None) -> None:
+    """Пересобрать агрегаты из incidents начиная с `since` (None — полностью).
+
+    Каждый день пересобирается в своей короткой транзакции под эксклюзивной
+    advisory-блокировкой этого дня: она ждёт незакоммиченные инкрементальные
+    обновления того же дня и держит новые только до commit, так что дельта
+    не учитывается дважды, а запись в остальные дни не ждёт сверку.
+    """
+    stats_days = select(Stats.day.label("day"))
+    incident_days = select(_day().label("day"))
+    if since:
+        stats_days = stats_days.where(Stats.day >= since)
+        incident_days = incident_days.where(
+            Incident.created_at >= datetime.combine(since, time.min, tzinfo=timezone.utc)
+        )
+    days = union(stats_days, incident_days).subquery()
+    result = await db.execute(select(days.c.day).order_by(days.c.day))
+    day_list = result.scalars().all()
+    await db.commit()
+
+    for day in day_list:
+        await _reconcile_day(db, day)
+    mark_changed()
@@ -0,0 +1,109 @@
+"""In-memory routing table for notification fan-out: event -> channel -> routes.
+
+Loaded once at startup and after every invalidate() (create/deactivate in
+app/api/notifications.py). Other app processes do not see this process's
+invalidations, so the table is also reloaded every NOTIFY_ROUTING_TTL seconds.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import NamedTuple, Optional
+
+from sqlalchemy.future import select
+
+from app.db.database import SessionLocal
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_ROUTING_TTL = float(os.getenv("NOTIFY_ROUTING_TTL", "60"))
+
+
+class Route(NamedTuple):
+    subscription_id: int
+    channel: str
+    target: str
+    # per-subscription delivery settings (app/services/notify_throttle.py)
+    rate_limit_per_minute: Optional[int] = None
+    digest_window_seconds: Optional[int] = None
+
+
+Routes = dict[str, tuple[Route, ...]]
+
+
+class RoutingTable:
+    def __init__(self, ttl: float = NOTIFY_ROUTING_TTL):
+        self.ttl = ttl
+        self._routes: dict[str, Routes] = {}
+        self._by_id: dict[int, Route] = {}
+        self._loaded_at: Optional[float] = None
+        # bumped by invalidate(); a load that raced with it does not count as fresh
+        self._generation = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def load(self) -> None:
+        generation = self._generation
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(
+                    Notification.id,
+                    Notification.event,
+                    Notification.channel,
+                    Notification.target,
+                    Notification.rate_limit_per_minute,
+                    Notification.digest_window_seconds,
+                )
+                .where(Notification.is_active == True)
+                .order_by(Notification.id)
+            )
+            rows = result.all()
+
+        grouped: dict[str, dict[str, list[Route]]] = {}
+        for sub_id, event, channel, target, rate, digest in rows:
+            channel = getattr(channel, "value", channel)
+            grouped.setdefault(event, {}).setdefault(channel, []).append(
+                Route(sub_id, channel, target, rate, digest)
+            )
+
+        self._routes = {
+            event: {channel: tuple(routes) for channel, routes in channels.items()}
+            for event, channels in grouped.items()
+        }
+        self._by_id = {
+            route.subscription_id: route
+            for channels in grouped.values()
+            for routes in channels.values()
+            for route in routes
+        }
+        if generation == self._generation:
+            self._loaded_at = time.monotonic()
+        logger.info(f"Notification routing table loaded: {len(rows)} subscriptions, {len(self._routes)} events")
+
+    def invalidate(self) -> None:
+        """Call after commit of any change to notifications."""
+        self._generation += 1
+        self._loaded_at = None
+
+    async def _refresh(self) -> None:
+        if self._stale():
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._stale():
+                    await self.load()
+
+    async def routes(self, event: str) -> Routes:
+        await self._refresh()
+        return self._routes.get(event, {})
+
+    async def route(self, subscription_id: int) -> Optional[Route]:
+        """Active subscription by id; None once it is deactivated or deleted."""
+        await self._refresh()
+        return self._by_id.get(subscription_id)
+
+
+notification_routes = RoutingTable()
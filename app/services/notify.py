@@ -4,9 +4,15 @@ import logging
 import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from app.models.notification import Notification
 from app.db.database import SessionLocal
-from sqlalchemy.future import select
+from app.models.notification_dead_letter import NotificationDeadLetter
+from app.services.circuit_breaker import BreakerRegistry, CircuitOpenError
+from app.services.http_clients import http_clients
+from app.services.notification_routing import Route, notification_routes
+from app.services.notify_throttle import NotificationThrottle
+from app.services.smtp_pool import smtp_pool
+from app.services.outbox import Deferred, OutboxDispatcher
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from typing import Optional
 
@@ -14,55 +20,117 @@ from typing import Optional
 logger = logging.getLogger(__name__)
 
 class NotificationService:
-    """Enhanced notification service with retries, timeouts, and logging."""
+    """Enhanced notification service with timeouts and logging.
+
+    Every delivery is a single attempt; retries and backoff belong to the
+    outbox (app/services/outbox.py), which reschedules the failed target.
+    """
     
     def __init__(self):
         self.timeout = httpx.Timeout(30.0)
-        self.max_retries = 3
-        self.retry_delay = 1.0  # seconds
-    
-    async def send_notification_event(self, event: str, message: str):
-        """Send notification to all active subscribers for the event."""
-        async with SessionLocal() as db:
-            result = await db.execute(
-                select(Notification).where(
-                    Notification.event == event, 
-                    Notification.is_active == True
-                )
-            )
-            notifs = result.scalars().all()
-            
-            tasks = []
-            for notif in notifs:
-                if notif.channel == "email":
-                    tasks.append(self._send_email_with_retry(notif.target, message))
-                elif notif.channel == "telegram":
-                    tasks.append(self._send_telegram_with_retry(notif.target, message))
-                elif notif.channel == "webhook":
-                    tasks.append(self._send_webhook_with_retry(notif.target, message))
-            
-            # Send all notifications concurrently
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for i, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Failed to send notification {i}: {result}")
-    
-    async def _send_email_with_retry(self, to: str, message: str) -> bool:
-        """Send email with retry logic."""
-        for attempt in range(self.max_retries):
-            try:
-                await self._send_email(to, message)
-                logger.info(f"Email sent successfully to {to}")
-                return True
-            except Exception as e:
-                logger.warning(f"Email attempt {attempt + 1} failed to {to}: {e}")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
-                else:
-                    logger.error(f"Failed to send email to {to} after {self.max_retries} attempts")
-                    return False
+        # Per-channel/per-target rate limits and digest mode
+        self.throttle = NotificationThrottle(self._send_route)
+        # Per-target circuit breakers (closed / open / half-open)
+        self.breakers = BreakerRegistry()
     
+    # Delivery interface of the outbox (app/services/outbox.py)
+
+    async def fan_out(self, event: str) -> list[int]:
+        """Subscriptions of the event, from the in-memory routing table."""
+        routes = await notification_routes.routes(event)
+        return [route.subscription_id for channel_routes in routes.values() for route in channel_routes]
+
+    async def deliver(self, subscription_id: int, message: str) -> Optional[Deferred]:
+        """Deliver to one subscription; raises if the target could not be reached.
+
+        Rate-limited and digest messages are buffered: the returned Deferred
+        resolves once the combined message is sent.
+        """
+        route = await notification_routes.route(subscription_id)
+        if route is None:
+            logger.info(f"Subscription {subscription_id} is no longer active, notification skipped")
+            return None
+        return await self.throttle.submit(route, message)
+
+    async def give_up(self, subscription_id: int, message: str, error: str):
+        """Retries are exhausted: keep the message in notification_dead_letters."""
+        route = await notification_routes.route(subscription_id)
+        if route is None:
+            logger.warning(f"Subscription {subscription_id} is gone, dropping undelivered notification")
+            return
+        await self._dead_letter(route, message, error)
+
+    async def flush(self):
+        """Send buffered digests / coalesced messages (shutdown)."""
+        await self.throttle.close()
+
+    def _sender(self, channel: str):
+        return {
+            "email": self._send_email,
+            "telegram": self._send_telegram,
+            "webhook": self._send_webhook,
+        }.get(channel)
+
+    async def _send_once(self, channel: str, send, target: str, message: str):
+        """One delivery attempt; re-raises the error for the outbox to retry."""
+        try:
+            await send(target, message)
+        except Exception as e:
+            logger.warning(f"{channel} notification to {target} failed: {e}")
+            raise
+        logger.info(f"{channel} notification sent successfully to {target}")
+
+    async def _send_route(self, route: Route, message: str):
+        """Deliver one (possibly coalesced) message to a subscription target.
+
+        Targets whose circuit breaker is open are not attempted. Raises on
+        failure; the outbox retries the target and dead-letters the message
+        after its last attempt.
+        """
+        send = self._sender(route.channel)
+        if send is None:
+            raise ValueError(f"Unknown notification channel {route.channel}")
+
+        breaker = self.breakers.get(route.channel, route.target)
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {route.channel} {route.target}")
+
+        probe = breaker.probing
+        try:
+            await self._send_once(route.channel, send, route.target, message)
+        except Exception:
+            breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+        finally:
+            # cancelled mid-probe (shutdown, worker cancel): neither success nor
+            # failure was recorded, so the breaker would stay blocked forever
+            if probe and breaker.probing:
+                breaker.release_probe()
+
+    async def replay(self, channel: str, target: str, message: str):
+        """Single delivery attempt for a dead letter; raises on failure."""
+        send = self._sender(channel)
+        if send is None:
+            raise ValueError(f"Unknown notification channel {channel}")
+        await self._send_once(channel, send, target, message)
+        self.breakers.get(channel, target).record_success()
+
+    async def _dead_letter(self, route: Route, message: str, error: str):
+        try:
+            async with SessionLocal() as db:
+                db.add(NotificationDeadLetter(
+                    subscription_id=route.subscription_id,
+                    channel=route.channel,
+                    target=route.target,
+                    message=message,
+                    error=error[:2000],
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store dead letter for {route.target}: {e}")
+
     async def _send_email(self, to: str, message: str):
         """Send email using SMTP."""
         msg = MIMEMultipart()
@@ -73,33 +141,8 @@ class NotificationService:
         text_part = MIMEText(message, 'plain', 'utf-8')
         msg.attach(text_part)
         
-        # Use aiosmtplib for async SMTP
-        import aiosmtplib
-        await aiosmtplib.send(
-            msg,
-            hostname=os.getenv("SMTP_HOST", "localhost"),
-            port=int(os.getenv("SMTP_PORT", "587")),
-            username=os.getenv("SMTP_USER"),
-            password=os.getenv("SMTP_PASS"),
-            use_tls=False,
-            start_tls=True,
-            timeout=self.timeout.timeout
-        )
-    
-    async def _send_telegram_with_retry(self, chat_id: str, message: str) -> bool:
-        """Send Telegram message with retry logic."""
-        for attempt in range(self.max_retries):
-            try:
-                await self._send_telegram(chat_id, message)
-                logger.info(f"Telegram message sent successfully to {chat_id}")
-                return True
-            except Exception as e:
-                logger.warning(f"Telegram attempt {attempt + 1} failed to {chat_id}: {e}")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
-                else:
-                    logger.error(f"Failed to send Telegram to {chat_id} after {self.max_retries} attempts")
-                    return False
+        # Reuses authenticated sessions (app/services/smtp_pool.py)
+        await smtp_pool.send_message(msg)
     
     async def _send_telegram(self, chat_id: str, message: str):
         """Send message via Telegram Bot API."""
@@ -114,28 +157,12 @@ class NotificationService:
             "parse_mode": "HTML"
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            if not result.get("ok"):
-                raise Exception(f"Telegram API error: {result.get('description')}")
-    
-    async def _send_webhook_with_retry(self, url: str, message: str) -> bool:
-        """Send webhook with retry logic."""
-        for attempt in range(self.max_retries):
-            try:
-                await self._send_webhook(url, message)
-                logger.info(f"Webhook sent successfully to {url}")
-                return True
-            except Exception as e:
-                logger.warning(f"Webhook attempt {attempt + 1} failed to {url}: {e}")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
-                else:
-                    logger.error(f"Failed to send webhook to {url} after {self.max_retries} attempts")
-                    return False
+        response = await http_clients.get(url).post(url, json=data, timeout=self.timeout)
+        response.raise_for_status()
+
+        result = response.json()
+        if not result.get("ok"):
+            raise Exception(f"Telegram API error: {result.get('description')}")
     
     async def _send_webhook(self, url: str, message: str):
         """Send webhook notification."""
@@ -150,14 +177,25 @@ class NotificationService:
             "User-Agent": "SOC-Portal/1.0"
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
+        # pooled keep-alive client per host (app/services/http_clients.py)
+        response = await http_clients.get(url).post(url, json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
 
 # Global notification service instance
 notification_service = NotificationService()
 
+# Outbox workers fan out queued events and deliver them through the service above
+outbox_dispatcher = OutboxDispatcher(notification_service)
+
+
+def enqueue_notification(db: AsyncSession, event: str, message: str):
+    """Queue an event in the caller's transaction; it is delivered after commit."""
+    outbox_dispatcher.enqueue(db, event, message)
+
+
 # Backward compatibility
 async def send_notification_event(event: str, message: str):
-    """Legacy function for backward compatibility."""
-    await notification_service.send_notification_event(event, message)
\ No newline at end of file
+    """Legacy function: queues the event in its own transaction."""
+    async with SessionLocal() as db:
+        enqueue_notification(db, event, message)
+        await db.commit()
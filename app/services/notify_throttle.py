@@ -0,0 +1,184 @@
+"""Rate limiting and coalescing of outgoing notifications.
+
+Two token buckets sit in front of every send:
+  - per channel (NOTIFY_CHANNEL_RATE_<CHANNEL> messages/s) — e.g. the
+    Telegram bot-wide limit; sends wait for a token;
+  - per target (subscription's rate_limit_per_minute, else
+    NOTIFY_TARGET_RATE_PER_MINUTE) — when it is empty the message is not
+    dropped but buffered and sent as one combined message once a token frees.
+
+A subscription with digest_window_seconds always buffers and sends one
+combined message per window.
+
+submit() returns a Deferred for a buffered message; its future resolves when
+the combined message has been sent (or fails). The outbox keeps the
+message's row leased until then, so a buffer lost with the process is
+delivered again from the outbox once the lease expires. close() flushes
+everything on shutdown.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.services.notification_routing import Route
+from app.services.outbox import Deferred
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_RATES = {
+    "email": float(os.getenv("NOTIFY_CHANNEL_RATE_EMAIL", "10")),
+    "telegram": float(os.getenv("NOTIFY_CHANNEL_RATE_TELEGRAM", "25")),
+    "webhook": float(os.getenv("NOTIFY_CHANNEL_RATE_WEBHOOK", "50")),
+}
+TARGET_RATE_PER_MINUTE = float(os.getenv("NOTIFY_TARGET_RATE_PER_MINUTE", "20"))
+TARGET_BURST = float(os.getenv("NOTIFY_TARGET_BURST", "5"))
+
+Send = Callable[[Route, str], Awaitable[object]]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def delay(self) -> float:
+        """Seconds until one token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        while not self.try_acquire():
+            await asyncio.sleep(self.delay())
+
+
+def combine(messages: list[str]) -> str:
+    if len(messages) == 1:
+        return messages[0]
+    return f"SOC Portal: {len(messages)} events\n\n" + "\n".join(f"• {m}" for m in messages)
+
+
+class _Pending:
+    __slots__ = ("route", "messages", "task", "future", "flush_at")
+
+    def __init__(self, route: Route, delay: float):
+        self.route = route
+        self.messages: list[str] = []
+        self.task: Optional[asyncio.Task] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.flush_at = time.monotonic() + delay
+
+    def deferred(self) -> Deferred:
+        return Deferred(self.future, max(0.0, self.flush_at - time.monotonic()))
+
+
+class NotificationThrottle:
+    def __init__(
+        self,
+        send: Send,
+        channel_rates: Optional[dict[str, float]] = None,
+        target_rate_per_minute: float = TARGET_RATE_PER_MINUTE,
+        target_burst: float = TARGET_BURST,
+    ):
+        self._send = send
+        self._channels = {
+            channel: TokenBucket(rate, capacity=max(1.0, rate))
+            for channel, rate in (channel_rates or CHANNEL_RATES).items()
+        }
+        self.target_rate_per_minute = target_rate_per_minute
+        self.target_burst = target_burst
+        self._targets: dict[tuple[str, str], TokenBucket] = {}
+        self._pending: dict[tuple[str, str], _Pending] = {}
+
+    def _target_bucket(self, route: Route) -> TokenBucket:
+        key = (route.channel, route.target)
+        rate = (route.rate_limit_per_minute or self.target_rate_per_minute) / 60
+        bucket = self._targets.get(key)
+        if bucket is None:
+            bucket = self._targets[key] = TokenBucket(rate, capacity=self.target_burst)
+        else:
+            bucket.rate = rate  # the subscription setting may have changed
+        return bucket
+
+    async def _deliver(self, route: Route, message: str):
+        bucket = self._channels.get(route.channel)
+        if bucket is not None:
+            await bucket.acquire()
+        return await self._send(route, message)
+
+    async def submit(self, route: Route, message: str) -> Optional[Deferred]:
+        """Send now (raises on failure) or buffer and return a Deferred."""
+        key = (route.channel, route.target)
+        pending = self._pending.get(key)
+
+        if route.digest_window_seconds:
+            return self._buffer(key, route, message, route.digest_window_seconds)
+
+        bucket = self._target_bucket(route)
+        if pending is None and bucket.try_acquire():
+            await self._deliver(route, message)
+            return None
+
+        # over the target's limit: coalesce until a token is available
+        return self._buffer(key, route, message, bucket.delay())
+
+    def _buffer(self, key, route: Route, message: str, delay: float) -> Deferred:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(route, delay)
+            pending.task = asyncio.create_task(self._flush_later(key, delay))
+        pending.route = route
+        pending.messages.append(message)
+        return pending.deferred()
+
+    async def _flush_later(self, key, delay: float) -> None:
+        await asyncio.sleep(delay)
+        pending = self._pending.get(key)
+        if pending is None or not pending.messages:
+            self._pending.pop(key, None)
+            return
+        if not pending.route.digest_window_seconds:
+            # the timer is only an estimate; wait for the target's token
+            bucket = self._target_bucket(pending.route)
+            while not bucket.try_acquire():
+                await asyncio.sleep(bucket.delay())
+        await self._flush(key)
+
+    async def _flush(self, key) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None or not pending.messages:
+            return
+        try:
+            await self._deliver(pending.route, combine(pending.messages))
+        except Exception as e:
+            logger.error(f"Failed to send coalesced notification to {pending.route.target}: {e}")
+            pending.future.set_exception(e)
+        except BaseException:
+            pending.future.cancel()
+            raise
+        else:
+            pending.future.set_result(None)
+
+    async def close(self) -> None:
+        """Send everything still buffered (app shutdown)."""
+        keys = list(self._pending)
+        for key in keys:
+            task = self._pending[key].task
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(self._flush(key) for key in keys), return_exceptions=True)
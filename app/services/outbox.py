@@ -0,0 +1,296 @@
+"""Transactional outbox for notification events.
+
+Endpoints add a NotificationOutbox row in the same transaction as the domain
+change (see enqueue); a small pool of workers claims committed rows and
+delivers them, so the HTTP response never waits for SMTP/Telegram/webhooks.
+
+Two kinds of rows:
+  - event rows (subscription_id IS NULL) are fanned out: one target row per
+    subscription routed for the event is inserted and the event row deleted,
+    in one transaction;
+  - target rows are delivered to their subscription. A failed delivery is
+    retried with exponential backoff for that target only, so targets that
+    already got the message never get it twice; after
+    NOTIFY_OUTBOX_MAX_ATTEMPTS the message is handed to give_up (dead letter).
+
+deliver may also hold a message back (rate limit, digest window) and return
+a Deferred. The row then stays leased until the held-back send is done and
+is only deleted (or retried) once its future resolves; if the process dies
+first, the lease expires and the message is delivered again.
+
+Claiming moves available_at forward by a lease instead of holding row locks
+during delivery: if a worker dies mid-delivery the row becomes visible again
+once the lease expires (at-least-once delivery). Several app processes can
+drain the same table — claims use FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import NamedTuple, Optional, Protocol
+
+from sqlalchemy import delete, event, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import SessionLocal
+from app.models.notification_outbox import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_WORKERS = int(os.getenv("NOTIFY_OUTBOX_WORKERS", "4"))
+OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFY_OUTBOX_BATCH_SIZE", "10"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("NOTIFY_OUTBOX_POLL_INTERVAL", "2"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("NOTIFY_OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFY_OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_DELAY = float(os.getenv("NOTIFY_OUTBOX_RETRY_DELAY", "5"))
+
+
+class Delivery(Protocol):
+    async def fan_out(self, event_name: str) -> list[int]:
+        """Subscription ids the event is routed to."""
+
+    async def deliver(self, subscription_id: int, message: str) -> Optional["Deferred"]:
+        """Deliver to one subscription; raises on failure, returns Deferred if held back."""
+
+    async def give_up(self, subscription_id: int, message: str, error: str) -> None:
+        """Called once the last attempt for a target has failed."""
+
+    async def flush(self) -> None:
+        """Send everything held back (shutdown); resolves the Deferred futures."""
+
+
+class Deferred(NamedTuple):
+    future: asyncio.Future      # result/exception of the held-back send
+    delay: float                # seconds until it is planned to go out
+
+
+class OutboxRow(NamedTuple):
+    id: int
+    event: str
+    subscription_id: Optional[int]
+    message: str
+    attempts: int
+
+
+class Outcome(NamedTuple):
+    done: list[int]                                    # rows to delete
+    retry: list[tuple[int, int]]                       # (row id, attempts)
+    fanned: list[tuple[OutboxRow, list[int]]]          # event row -> subscription ids
+    deferred: list[tuple[OutboxRow, Deferred]]         # held back, keep leased
+
+
+class OutboxDispatcher:
+    """Worker pool draining notification_outbox."""
+
+    def __init__(
+        self,
+        delivery: Delivery,
+        workers: int = OUTBOX_WORKERS,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        lease_seconds: int = OUTBOX_LEASE_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        retry_delay: float = OUTBOX_RETRY_DELAY,
+    ):
+        self.delivery = delivery
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._settling: set[asyncio.Task] = set()
+
+    def enqueue(self, db: AsyncSession, event_name: str, message: str) -> None:
+        """Add an outbox row to the caller's transaction; workers are woken after commit."""
+        db.add(NotificationOutbox(event=event_name, message=message))
+        event.listen(db.sync_session, "after_commit", self._on_commit, once=True)
+
+    def _on_commit(self, session) -> None:
+        self.wake()
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"notify-outbox-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # send held-back messages and ack their rows before the loop goes away
+        try:
+            await self.delivery.flush()
+        except Exception as e:
+            logger.error(f"Outbox flush on shutdown failed: {e}")
+        await asyncio.gather(*self._settling, return_exceptions=True)
+        self._wakeup = None
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim(self, db: AsyncSession) -> list[OutboxRow]:
+        due = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.available_at <= func.now())
+            .order_by(NotificationOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due))
+            .values(
+                available_at=func.now() + timedelta(seconds=self.lease_seconds),
+                attempts=NotificationOutbox.attempts + 1,
+            )
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.event,
+                NotificationOutbox.subscription_id,
+                NotificationOutbox.message,
+                NotificationOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = [OutboxRow(*row) for row in result.all()]
+        await db.commit()
+        return rows
+
+    async def _handle(self, row: OutboxRow):
+        if row.subscription_id is None:
+            return await self.delivery.fan_out(row.event)
+        return await self.delivery.deliver(row.subscription_id, row.message)
+
+    async def _judge(self, row: OutboxRow, result, outcome: Outcome) -> None:
+        if not isinstance(result, BaseException):
+            if row.subscription_id is None:
+                outcome.fanned.append((row, list(result)))
+            elif isinstance(result, Deferred):
+                outcome.deferred.append((row, result))
+            else:
+                outcome.done.append(row.id)
+            return
+
+        where = f"{row.event} #{row.id}" + (f" -> subscription {row.subscription_id}" if row.subscription_id else "")
+        if row.attempts < self.max_attempts:
+            logger.warning(f"Outbox {where} attempt {row.attempts} failed: {result}")
+            outcome.retry.append((row.id, row.attempts))
+            return
+
+        logger.error(f"Outbox {where} dropped after {row.attempts} attempts: {result}")
+        if row.subscription_id is not None:
+            try:
+                await self.delivery.give_up(row.subscription_id, row.message, str(result) or type(result).__name__)
+            except Exception as e:
+                logger.error(f"Outbox give_up failed for {where}: {e}")
+        outcome.done.append(row.id)
+
+    async def _process(self, rows: list[OutboxRow]) -> Outcome:
+        results = await asyncio.gather(*(self._handle(row) for row in rows), return_exceptions=True)
+        outcome = Outcome([], [], [], [])
+        for row, result in zip(rows, results):
+            await self._judge(row, result, outcome)
+        return outcome
+
+    def _watch(self, deferred: list[tuple[OutboxRow, Deferred]]) -> None:
+        """Ack deferred rows once their held-back send has finished."""
+        groups: dict[int, tuple[asyncio.Future, list[OutboxRow]]] = {}
+        for row, d in deferred:
+            groups.setdefault(id(d.future), (d.future, []))[1].append(row)
+        for future, rows in groups.values():
+            future.add_done_callback(lambda f, rows=rows: self._spawn_settle(rows, f))
+
+    def _spawn_settle(self, rows: list[OutboxRow], future: asyncio.Future) -> None:
+        task = asyncio.create_task(self._settle(rows, future))
+        self._settling.add(task)
+        task.add_done_callback(self._settling.discard)
+
+    async def _settle(self, rows: list[OutboxRow], future: asyncio.Future) -> None:
+        if future.cancelled():
+            return  # the rows stay leased and come back when the lease expires
+        outcome = Outcome([], [], [], [])
+        for row in rows:
+            await self._judge(row, future.exception(), outcome)
+        try:
+            async with SessionLocal() as db:
+                await self._apply(db, outcome)
+        except Exception as e:
+            logger.error(f"Outbox failed to ack deferred rows {[r.id for r in rows]}: {e}")
+
+    async def _apply(self, db: AsyncSession, outcome: Outcome) -> None:
+        targets = [
+            {"event": row.event, "subscription_id": sub_id, "message": row.message}
+            for row, sub_ids in outcome.fanned
+            for sub_id in sub_ids
+        ]
+        if targets:
+            await db.execute(insert(NotificationOutbox), targets)
+        done = outcome.done + [row.id for row, _ in outcome.fanned]
+        if done:
+            await db.execute(
+                delete(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(done))
+                .execution_options(synchronize_session=False)
+            )
+        for row_id, attempts in outcome.retry:
+            delay = self.retry_delay * (2 ** (attempts - 1))
+            await db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id == row_id)
+                .values(available_at=func.now() + timedelta(seconds=delay), attempts=attempts)
+                .execution_options(synchronize_session=False)
+            )
+        for row, deferred in outcome.deferred:
+            # holding back is not a failed attempt; keep the row leased past the planned send
+            await db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id == row.id)
+                .values(
+                    available_at=func.now() + timedelta(seconds=deferred.delay + self.lease_seconds),
+                    attempts=row.attempts - 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        if targets:
+            self.wake()
+
+    async def drain_once(self) -> int:
+        """Claim one batch and process it; returns the number of rows claimed."""
+        async with SessionLocal() as db:
+            rows = await self._claim(db)
+            if not rows:
+                return 0
+            outcome = await self._process(rows)
+            await self._apply(db, outcome)
+        if outcome.deferred:
+            self._watch(outcome.deferred)
+        return len(rows)
@@ -1,14 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select, delete
-from datetime import datetime, timedelta
-from app.models.report import ReportArchive
-import os
 
+from app.services.retention import SweepStats, sweep_reports
 
-async def cleanup_old_reports(db: AsyncSession):
-    days = int(os.getenv("REPORT_RETENTION_DAYS", "30"))
-    cutoff = datetime.utcnow() - timedelta(days=days)
 
-    stmt = delete(ReportArchive).where(ReportArchive.generated_at < cutoff)
-    await db.execute(stmt)
-    await db.commit()
\ No newline at end of file
+async def cleanup_old_reports(db: AsyncSession) -> SweepStats:
+    """Удалить отчёты старше REPORT_RETENTION_DAYS (пачками, см. app/services/retention.py)."""
+    return await sweep_reports(db)
@@ -0,0 +1,181 @@
+"""Удаление старых отчётов и осиротевших файлов.
+
+Удаляем пачками по RETENTION_BATCH_SIZE строк, каждая пачка — отдельная
+короткая транзакция; строки, которые сейчас кто-то держит (скачивание,
+миграция blob-ов), пропускаются через SKIP LOCKED и попадут в следующий
+проход. Так таблица не блокируется одним огромным DELETE.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.attachment import Attachment
+from app.models.message import Message
+from app.models.report import ReportArchive
+from app.services.blob_store import BlobStore, get_blob_store
+
+REPORT_RETENTION_DAYS = int(os.getenv("REPORT_RETENTION_DAYS", "30"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+# пауза между пачками, чтобы не занимать соединение/IO подряд
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+ATTACHMENTS_DIR = os.getenv("ATTACHMENTS_DIR", "attachments")
+# свежие файлы не трогаем: строка в БД могла ещё не закоммититься
+ATTACHMENT_ORPHAN_GRACE = int(os.getenv("ATTACHMENT_ORPHAN_GRACE_MINUTES", "60")) * 60
+
+
+@dataclass
+class SweepStats:
+    reports_deleted: int = 0
+    blobs_deleted: int = 0
+    files_deleted: int = 0
+    bytes_reclaimed: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.reports_deleted} reports, {self.blobs_deleted} blobs, "
+            f"{self.files_deleted} orphan files, {self.bytes_reclaimed} bytes reclaimed"
+        )
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _delete_unreferenced_blobs(
+    db: AsyncSession, store: BlobStore, sizes: dict[str, int], stats: SweepStats
+) -> None:
+    """Удалить из store blob-ы удалённых строк, если на них больше никто не ссылается."""
+    if not sizes:
+        return
+    result = await db.execute(
+        select(ReportArchive.content_sha256)
+        .where(ReportArchive.content_sha256.in_(list(sizes)))
+        .distinct()
+    )
+    still_used = set(result.scalars().all())
+    for key, size in sizes.items():
+        if key in still_used:
+            continue
+        # Узкое окно гонки с put() того же содержимого допустимо: отчёты
+        # старше срока хранения повторно с теми же байтами почти не создаются.
+        await store.delete(key)
+        stats.blobs_deleted += 1
+        stats.bytes_reclaimed += size or 0
+
+
+async def sweep_reports(
+    db: AsyncSession,
+    retention_days: int = REPORT_RETENTION_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    stats: Optional[SweepStats] = None,
+) -> SweepStats:
+    stats = stats or SweepStats()
+    store = get_blob_store()
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    while True:
+        victims = (
+            select(ReportArchive.id)
+            .where(ReportArchive.generated_at < cutoff)
+            .order_by(ReportArchive.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(ReportArchive)
+            .where(ReportArchive.id.in_(victims))
+            .returning(
+                ReportArchive.content_sha256,
+                ReportArchive.size,
+                func.coalesce(func.octet_length(ReportArchive.content), 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if not rows:
+            await db.commit()
+            break
+
+        sizes: dict[str, int] = {}
+        for key, size, legacy_bytes in rows:
+            if key:
+                sizes[key] = size or 0
+            stats.bytes_reclaimed += legacy_bytes
+        stats.reports_deleted += len(rows)
+        await db.commit()
+
+        await _delete_unreferenced_blobs(db, store, sizes, stats)
+        await db.commit()
+
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(RETENTION_BATCH_PAUSE)
+
+    return stats
+
+
+def _list_old_files(directory: str, grace: int) -> list[tuple[str, int]]:
+    if not os.path.isdir(directory):
+        return []
+    threshold = time.time() - grace
+    files = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+            if st.st_mtime < threshold:
+                files.append((entry.name, st.st_size))
+    return files
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+async def sweep_orphan_attachments(
+    db: AsyncSession,
+    directory: str = ATTACHMENTS_DIR,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    grace: int = ATTACHMENT_ORPHAN_GRACE,
+    stats: Optional[SweepStats] = None,
+) -> SweepStats:
+    """Файлы в attachments/, на которые не ссылаются ни messages.attachment, ни attachments.file_path."""
+    stats = stats or SweepStats()
+    files = await asyncio.to_thread(_list_old_files, directory, grace)
+
+    for batch in _chunks(files, batch_size):
+        names = [name for name, _ in batch]
+        # attachments.file_path хранит абсолютный путь, messages.attachment — имя файла
+        paths = {name: os.path.join(os.path.abspath(directory), name) for name in names}
+
+        referenced = set((await db.execute(
+            select(Message.attachment).where(Message.attachment.in_(names))
+        )).scalars().all())
+        referenced_paths = set((await db.execute(
+            select(Attachment.file_path).where(Attachment.file_path.in_(list(paths.values())))
+        )).scalars().all())
+
+        for name, size in batch:
+            if name in referenced or paths[name] in referenced_paths:
+                continue
+            if await asyncio.to_thread(_remove, os.path.join(directory, name)):
+                stats.files_deleted += 1
+                stats.bytes_reclaimed += size
+        await db.commit()  # не держим транзакцию открытой между пачками
+        await asyncio.sleep(RETENTION_BATCH_PAUSE)
+
+    return stats
@@ -0,0 +1,127 @@
+"""Pool of authenticated SMTP sessions.
+
+aiosmtplib.send() connects, runs EHLO/STARTTLS/AUTH and quits for every
+message. Here sessions are kept open and reused for up to
+SMTP_MAX_MESSAGES_PER_CONNECTION messages; idle sessions older than
+SMTP_IDLE_TIMEOUT are dropped. If the server closed a session (timeout,
+421, restart) the message is retried once on a fresh connection.
+"""
+import asyncio
+import logging
+import os
+import time
+from email.message import Message
+from typing import Optional
+
+import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+
+def _is_disconnect(error: Exception) -> bool:
+    if isinstance(error, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError)):
+        return True
+    # 421: service not available, closing transmission channel
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code == 421
+
+
+class _Session:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    def __init__(
+        self,
+        hostname: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = SMTP_POOL_SIZE,
+        max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+        timeout: float = SMTP_TIMEOUT,
+    ):
+        self.hostname = hostname or os.getenv("SMTP_HOST", "localhost")
+        self.port = port or int(os.getenv("SMTP_PORT", "587"))
+        self.username = username if username is not None else os.getenv("SMTP_USER")
+        self.password = password if password is not None else os.getenv("SMTP_PASS")
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: list[_Session] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _connect(self):
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=False,
+            start_tls=True,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password or "")
+        return smtp
+
+    @staticmethod
+    async def _close(session: _Session) -> None:
+        try:
+            await session.smtp.quit()
+        except Exception:
+            session.smtp.close()
+
+    async def _acquire(self) -> _Session:
+        now = time.monotonic()
+        while self._idle:
+            session = self._idle.pop()
+            if session.smtp.is_connected and now - session.last_used < self.idle_timeout:
+                return session
+            await self._close(session)
+        return _Session(await self._connect())
+
+    async def _release(self, session: _Session) -> None:
+        session.sent += 1
+        session.last_used = time.monotonic()
+        if session.sent >= self.max_messages:
+            await self._close(session)
+        else:
+            self._idle.append(session)
+
+    async def send_message(self, message: Message) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            session = await self._acquire()
+            try:
+                await session.smtp.send_message(message)
+            except Exception as e:
+                session.smtp.close()
+                if not _is_disconnect(e):
+                    raise
+                logger.info(f"SMTP session dropped ({e}), reconnecting")
+                session = _Session(await self._connect())
+                try:
+                    await session.smtp.send_message(message)
+                except Exception:
+                    session.smtp.close()
+                    raise
+            await self._release(session)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._close(s) for s in idle), return_exceptions=True)
+
+
+smtp_pool = SMTPPool()
@@ -0,0 +1,62 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models.user import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+
+class UserIdentityCache:
+    """In-process cache of User rows keyed by email.
+
+    Stores a plain snapshot of the columns and hands out a fresh detached
+    User per lookup, so request handlers never share ORM instances.
+
+    The cache is process-local: invalidate() only drops this worker's copy.
+    Other workers and replicas see a changed user (role, MFA secret) once
+    their entry expires, i.e. after at most USER_CACHE_TTL seconds.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._columns = [attr.key for attr in inspect(User).column_attrs]
+
+    def get(self, email: str) -> Optional[User]:
+        item = self._items.get(email)
+        if item is None:
+            return None
+        expires_at, values = item
+        if expires_at <= time.monotonic():
+            del self._items[email]
+            return None
+        self._items.move_to_end(email)
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User) -> None:
+        if self.maxsize <= 0 or not user.email:
+            return
+        values = {key: getattr(user, key) for key in self._columns}
+        self._items[user.email] = (time.monotonic() + self.ttl, values)
+        self._items.move_to_end(user.email)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, email: Optional[str]) -> None:
+        if email:
+            self._items.pop(email, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+user_cache = UserIdentityCache(USER_CACHE_TTL, USER_CACHE_SIZE)
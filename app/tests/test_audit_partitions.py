@@ -0,0 +1,15 @@
+from datetime import date
+
+from app.services.audit_partitions import add_months, create_partition_sql, partition_name
+
+
+def test_add_months_crosses_year():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_ddl_covers_one_utc_month():
+    assert partition_name(date(2026, 12, 1)) == "audit_logs_y2026m12"
+    sql = create_partition_sql(date(2026, 12, 15))
+    assert "audit_logs_y2026m12 PARTITION OF audit_logs" in sql
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
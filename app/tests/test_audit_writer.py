@@ -0,0 +1,74 @@
+import asyncio
+
+from app.services.audit_writer import AuditWriter
+
+
+class MemoryAuditWriter(AuditWriter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    async def _write(self, batch):
+        if batch:
+            self.batches.append(list(batch))
+            self.written += len(batch)
+
+
+def _event(i):
+    return {"path": f"/api/x/{i}", "method": "POST", "status_code": 200}
+
+
+def test_events_are_written_in_batches():
+    writer = MemoryAuditWriter(batch_size=10, flush_interval=0.05)
+
+    async def run():
+        await writer.start()
+        for i in range(25):
+            await writer.submit(_event(i))
+        await asyncio.sleep(0.2)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert writer.written == 25
+    assert [len(b) for b in writer.batches] == [10, 10, 5]
+
+
+def test_full_queue_drops_and_counts():
+    writer = MemoryAuditWriter(maxsize=3, enqueue_timeout=0.01)
+
+    async def run():
+        # без фоновой задачи очередь никто не разбирает
+        results = [await writer.submit(_event(i)) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        await writer.stop()
+
+    asyncio.run(run())
+    assert writer.dropped == 2
+    assert writer.written == 3
+
+
+class SlowAuditWriter(MemoryAuditWriter):
+    async def _write(self, batch):
+        await super()._write(batch)
+        if batch:
+            # пачка уже закоммичена, но закрытие сессии ещё идёт
+            self.started = True
+            await asyncio.sleep(0.05)
+
+
+def test_stop_during_write_does_not_duplicate_batch():
+    writer = SlowAuditWriter(batch_size=3, flush_interval=0.01)
+    writer.started = False
+
+    async def run():
+        await writer.start()
+        for i in range(3):
+            await writer.submit(_event(i))
+        while not writer.started:
+            await asyncio.sleep(0.001)
+        # stop() отменяет фоновую задачу посреди записи пачки
+        await writer.stop()
+
+    asyncio.run(run())
+    assert writer.written == 3
+    assert [len(b) for b in writer.batches] == [3]
@@ -0,0 +1,48 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies.auth import AuthContext, get_auth_context, require_realm_roles, require_roles
+from app.models.user import User
+
+
+def _client(ctx: AuthContext):
+    app = FastAPI()
+
+    @app.get("/admin-only", dependencies=[Depends(require_realm_roles("admin"))])
+    async def admin_only():
+        return {"ok": True}
+
+    @app.get("/manager", dependencies=[Depends(require_realm_roles("manager"))])
+    async def manager():
+        return {"ok": True}
+
+    @app.get("/manager-app", dependencies=[Depends(require_roles("manager"))])
+    async def manager_app():
+        return {"ok": True}
+
+    app.dependency_overrides[get_auth_context] = lambda: ctx
+    return TestClient(app)
+
+
+def _ctx(db_role, kc_roles=None):
+    user = User(id=1, email="u@soc.local", username="u", role=db_role)
+    claims = None if kc_roles is None else {"realm_access": {"roles": kc_roles}}
+    return AuthContext(user, {db_role, *(kc_roles or [])}, claims)
+
+
+def test_realm_guard_accepts_exact_keycloak_role():
+    client = _client(_ctx("admin", ["admin"]))
+    assert client.get("/admin-only").status_code == 200
+
+
+def test_realm_guard_rejects_cookie_session_even_for_admin():
+    assert _client(_ctx("admin")).get("/admin-only").status_code == 401
+
+
+def test_realm_guard_has_no_admin_bypass_or_prefix_normalization():
+    # локальный admin не проходит require_realm_roles("manager") ...
+    assert _client(_ctx("admin", ["admin"])).get("/manager").status_code == 403
+    # ... и soc_manager не равен manager
+    assert _client(_ctx("manager", ["soc_manager"])).get("/manager").status_code == 403
+    # а require_roles по-прежнему пускает админа везде
+    assert _client(_ctx("admin")).get("/manager-app").status_code == 200
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.services.blob_store import LocalBlobStore, S3BlobStore, content_key
+
+
+async def _read(store, key, start=0, end=None, chunk_size=4):
+    return b"".join([chunk async for chunk in store.iter_range(key, start, end, chunk_size)])
+
+
+def test_local_store_deduplicates(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    data = b"same report bytes"
+
+    first = asyncio.run(store.put(data))
+    second = asyncio.run(store.put(data))
+
+    assert first == second == content_key(data)
+    files = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert len(files) == 1
+
+
+def test_local_store_ranged_read(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    key = asyncio.run(store.put(b"0123456789"))
+
+    assert asyncio.run(_read(store, key)) == b"0123456789"
+    assert asyncio.run(_read(store, key, 2, 6)) == b"23456"
+    assert asyncio.run(_read(store, key, 8)) == b"89"
+
+
+class _NotFound(Exception):
+    """Как botocore ClientError: код ошибки в response."""
+
+    def __init__(self):
+        super().__init__("Not Found")
+        self.response = {"Error": {"Code": "404"}}
+
+
+class _Body:
+    def __init__(self, data):
+        self._data = data
+        self.closed = False
+
+    def read(self, size):
+        chunk, self._data = self._data[:size], self._data[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeS3Client:
+    """Локальная заглушка S3: head/put/get (с Range)/delete по словарю."""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _NotFound()
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.puts += 1
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def get_object(self, Bucket, Key, Range):
+        data = self.objects[(Bucket, Key)]
+        start, _, end = Range[len("bytes="):].partition("-")
+        stop = len(data) if end == "" else int(end) + 1
+        return {"Body": _Body(data[int(start):stop])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_s3_store_deduplicates_reads_ranges_and_deletes():
+    client = FakeS3Client()
+    store = S3BlobStore("reports-bucket", prefix="reports/", client=client)
+
+    key = asyncio.run(store.put(b"0123456789"))
+    assert asyncio.run(store.put(b"0123456789")) == key
+    assert client.puts == 1
+    assert list(client.objects) == [("reports-bucket", f"reports/{key}")]
+
+    assert asyncio.run(_read(store, key)) == b"0123456789"
+    assert asyncio.run(_read(store, key, 2, 6)) == b"23456"
+    assert asyncio.run(_read(store, key, 8)) == b"89"
+
+    assert asyncio.run(store.exists(key))
+    asyncio.run(store.delete(key))
+    assert not asyncio.run(store.exists(key))
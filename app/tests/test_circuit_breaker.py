@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.notification_routing import Route
+from app.services.notify import NotificationService
+
+
+def test_opens_after_threshold_and_probes_after_timeout(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    now[0] += 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()          # one probe
+    assert not breaker.allow()      # concurrent sends still blocked
+
+    breaker.record_failure()        # failed probe re-opens immediately
+    assert breaker.state == OPEN
+
+    now[0] += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_cancelled_probe_releases_half_open_breaker(monkeypatch):
+    service = NotificationService()
+    route = Route(1, "webhook", "http://hook.example")
+    breaker = service.breakers.get(route.channel, route.target)
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+    async def hang(target, message):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(service, "_sender", lambda channel: hang)
+
+    async def run():
+        task = asyncio.create_task(service._send_route(route, "probe"))
+        await asyncio.sleep(0.01)
+        assert breaker.probing
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert not breaker.probing
+    assert breaker.state == HALF_OPEN and breaker.allow()
+
+
+def test_failed_send_is_attempted_once_per_delivery(monkeypatch):
+    """Retries belong to the outbox: no inline retry loop, no sleeping."""
+    service = NotificationService()
+    route = Route(1, "webhook", "http://hook.example")
+    calls = []
+
+    async def fail(target, message):
+        calls.append(target)
+        raise ConnectionError("refused")
+
+    async def no_sleep(delay):
+        raise AssertionError("delivery must not sleep between attempts")
+
+    monkeypatch.setattr(service, "_sender", lambda channel: fail)
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(service._send_route(route, "hello"))
+    assert calls == ["http://hook.example"]
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.config import attach_metrics
+from app.db.pool import MeteredPool
+
+
+def test_pool_metrics_count_checkouts_overflow_and_timeouts():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=MeteredPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    metrics = attach_metrics(engine, "test")
+
+    first = engine.connect()
+    first.execute(text("select 1"))
+    second = engine.connect()  # в overflow
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = metrics.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    second.close()
+    first.close()
+    engine.dispose()
+    assert metrics.snapshot()["checked_out"] == 0
+    assert metrics.snapshot()["checkouts"] == 2
@@ -0,0 +1,18 @@
+import asyncio
+
+from app.services.http_clients import HTTPClientPool
+
+
+def test_one_client_per_host():
+    pool = HTTPClientPool(http2=False)
+
+    a = pool.get("https://hooks.example.com/a")
+    b = pool.get("https://hooks.example.com:443/b?x=1")
+    other = pool.get("http://hooks.example.com/a")
+
+    assert a is b
+    assert other is not a
+
+    asyncio.run(pool.close())
+    assert a.is_closed and other.is_closed
+    assert pool.get("https://hooks.example.com/a") is not a
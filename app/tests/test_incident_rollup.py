@@ -0,0 +1,87 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.api import incidents
+from app.services import incident_rollup
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class Result:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+
+class RecordingSession:
+    """Пишет SQL и commit-ы по порядку; первый execute отдаёт `first`."""
+
+    def __init__(self, first=()):
+        self.log = []
+        self.first = first
+
+    async def execute(self, stmt):
+        self.log.append(_sql(stmt))
+        if len(self.log) == 1:
+            return Result(self.first)
+        return Result()
+
+    async def commit(self):
+        self.log.append("COMMIT")
+
+
+def test_add_and_remove_apply_signed_delta_under_day_lock():
+    db = RecordingSession()
+    asyncio.run(incident_rollup.add_incident(db, 5))
+    asyncio.run(incident_rollup.remove_incident(db, 5))
+
+    lock, add, _, remove = db.log
+    assert "pg_advisory_xact_lock_shared(7020001" in lock
+    assert "DATE '1970-01-01'" in lock and "incidents.id = 5" in lock
+    # дельта прибавляется к текущим значениям, а не перезаписывает их
+    assert "incidents = (incident_daily_stats.incidents + excluded.incidents)" in add
+    assert "incidents.id = 5" in add and "* -1" in remove
+
+
+def test_reconcile_rebuilds_each_day_in_its_own_transaction():
+    days = [date(2026, 3, 1), date(2026, 3, 2)]
+    db = RecordingSession(first=days)
+    before = incident_rollup.version()
+    asyncio.run(incident_rollup.reconcile(db, since=date(2026, 3, 1)))
+
+    assert "UNION" in db.log[0] and db.log[1] == "COMMIT"
+    per_day = db.log[2:]
+    assert len(per_day) == 4 * len(days)
+    for i, day in enumerate(days):
+        lock, upsert, prune, commit = per_day[4 * i:4 * i + 4]
+        assert f"pg_advisory_xact_lock(7020001, {(day - date(1970, 1, 1)).days})" in lock
+        assert f"incidents.created_at >= '{day.isoformat()} 00:00:00+00:00'" in upsert
+        assert "incidents = excluded.incidents" in upsert      # перезапись, не дельта
+        assert f"incident_daily_stats.day = '{day.isoformat()}'" in prune and "NOT IN" in prune
+        assert commit == "COMMIT"
+    assert incident_rollup.version() == before + 1
+
+
+def test_reconcile_with_no_days_only_bumps_version():
+    db = RecordingSession(first=[])
+    before = incident_rollup.version()
+    asyncio.run(incident_rollup.reconcile(db))
+    assert db.log[1:] == ["COMMIT"] and incident_rollup.version() == before + 1
+
+
+def test_close_and_reopen_lock_the_incident_row():
+    db = RecordingSession()
+    assert asyncio.run(incidents._lock_incident(db, 9)) is None
+    assert "WHERE incidents.id = 9" in db.log[0] and db.log[0].endswith("FOR UPDATE")
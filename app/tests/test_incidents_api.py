@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.api import incidents
+from app.db.database import get_db
+from app.db.pagination import decode_cursor, encode_cursor
+from app.dependencies.auth import AuthContext, get_auth_context
+from app.models.incident import Incident
+from app.models.user import User
+
+T0 = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _incident(i):
+    return Incident(
+        id=i, title=f"inc {i}", description="d", status="open", priority="high",
+        client_id=3, created_at=T0 - timedelta(minutes=i),
+    )
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class PageSession:
+    """Отдаёт первые LIMIT+1 строк из `rows` и запоминает SQL запросов."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.sql = []
+
+    async def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})))
+        return Result(self.rows[:stmt._limit])
+
+
+def _client(rows, role="analyst", user_id=1):
+    session = PageSession(rows)
+    user = User(id=user_id, email=f"{role}@soc.local", username=role, role=role)
+    app = FastAPI()
+    app.include_router(incidents.router)
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_auth_context] = lambda: AuthContext(user, {role})
+    return TestClient(app), session
+
+
+def test_default_request_returns_one_page_with_next_cursor():
+    client, session = _client([_incident(i) for i in range(1, 200)])
+    resp = client.get("/api/incidents/my")
+
+    assert resp.status_code == 200
+    assert len(resp.json()) == incidents.DEFAULT_PAGE_SIZE
+    assert f"LIMIT {incidents.DEFAULT_PAGE_SIZE + 1}" in session.sql[0]
+    last = resp.json()[-1]
+    assert decode_cursor(resp.headers["x-next-cursor"])[1] == last["id"]
+
+
+def test_last_page_has_no_cursor_and_filters_go_to_sql():
+    client, session = _client([_incident(1), _incident(2)])
+    cursor = encode_cursor(T0, 10)
+    resp = client.get(
+        "/api/incidents/my",
+        params={"limit": 5, "cursor": cursor, "status": "open", "priority": "high",
+                "created_from": "2026-04-01T00:00:00+00:00"},
+    )
+
+    assert [row["id"] for row in resp.json()] == [1, 2]
+    assert "x-next-cursor" not in resp.headers
+    sql = session.sql[0]
+    assert "incidents.status = 'open'" in sql and "incidents.priority = 'high'" in sql
+    assert "incidents.created_at >= '2026-04-01 00:00:00+00:00'" in sql
+    assert "(incidents.created_at, incidents.id) <" in sql and "LIMIT 6" in sql
+
+
+def test_client_only_sees_own_incidents():
+    client, session = _client([], role="client", user_id=3)
+    assert client.get("/api/incidents/my", params={"client_id": 99}).json() == []
+    assert "incidents.client_id = 3" in session.sql[0]
+    assert "client_id = 99" not in session.sql[0]
+
+
+def test_limit_is_bounded():
+    client, _ = _client([])
+    assert client.get("/api/incidents/my", params={"limit": 501}).status_code == 422
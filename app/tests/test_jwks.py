@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.security.jwks import JWKSError, JWKSManager
+
+JWKS_URL = "http://keycloak.test/realms/soc/protocol/openid-connect/certs"
+
+
+def _jwk(kid: str) -> dict:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return jwk
+
+
+class FakeKeycloak:
+    def __init__(self, kids):
+        self.jwks = {"keys": [_jwk(k) for k in kids]}
+        self.calls = 0
+        self.down = False
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.down:
+            return httpx.Response(503)
+        return httpx.Response(200, json=self.jwks)
+
+
+def _manager(kc: FakeKeycloak) -> JWKSManager:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(kc.handler))
+    return JWKSManager(JWKS_URL, min_refetch_interval=60, client=client)
+
+
+def test_kid_miss_is_coalesced():
+    """Concurrent requests with an unknown kid share a single fetch."""
+    kc = FakeKeycloak(["k1"])
+    manager = _manager(kc)
+
+    async def run():
+        return await asyncio.gather(*(manager.get_key("k1") for _ in range(20)))
+
+    keys = asyncio.run(run())
+    assert kc.calls == 1
+    assert all(k is keys[0] for k in keys)
+
+
+def test_last_known_keys_survive_outage():
+    kc = FakeKeycloak(["k1"])
+    manager = _manager(kc)
+
+    async def run():
+        await manager.refresh()
+        kc.down = True
+        with pytest.raises(JWKSError):
+            await manager.refresh()
+        return await manager.get_key("k1")
+
+    assert asyncio.run(run()) is not None
+
+
+def test_unknown_kid_refetch_is_throttled():
+    kc = FakeKeycloak(["k1"])
+    manager = _manager(kc)
+
+    async def run():
+        await manager.refresh()
+        for _ in range(5):
+            with pytest.raises(JWKSError):
+                await manager.get_key("bogus")
+
+    asyncio.run(run())
+    assert kc.calls == 1
@@ -0,0 +1,63 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.security.headers import DOWNLOAD, HeaderProfiles, header_profile
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(CSRFMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/file", dependencies=[Depends(header_profile(DOWNLOAD))])
+    async def file():
+        return {"ok": True}
+
+    @app.post("/ping")
+    async def ping_post():
+        return {"ok": True}
+
+    return app
+
+
+def test_security_headers_depend_on_host_and_docs():
+    client = TestClient(_app(), base_url="http://soc.example")
+    csp = client.get("/ping").headers["content-security-policy"]
+    assert "script-src 'self';" in csp
+    assert client.get("/ping").headers["x-frame-options"] == "DENY"
+
+    local = TestClient(_app(), base_url="http://localhost:8000")
+    assert "'unsafe-eval'" in local.get("/ping").headers["content-security-policy"]
+    assert "cdn.jsdelivr.net" in local.get("/docs").headers["content-security-policy"]
+
+
+def test_csrf_cookie_is_issued_and_verified():
+    client = TestClient(_app(), base_url="http://soc.example")
+    response = client.get("/ping")
+    cookie = response.cookies["csrf_token"]
+    nonce = cookie.split(".", 1)[0]
+
+    assert client.post("/ping").status_code == 403
+    assert client.post("/ping", headers={"X-CSRF-Token": nonce}).status_code == 200
+    assert client.post("/ping", headers={"X-CSRF-Token": "forged"}).status_code == 403
+    assert client.post("/ping", headers={"Authorization": "Bearer x"}, cookies={"csrf_token": ""}).status_code == 200
+
+
+def test_route_selects_header_profile():
+    client = TestClient(_app(), base_url="http://soc.example")
+    assert client.get("/file").headers["content-security-policy"].startswith("default-src 'none'")
+    assert "default-src 'self'" in client.get("/ping").headers["content-security-policy"]
+
+
+def test_profiles_are_prebuilt_per_host_class():
+    profiles = HeaderProfiles()
+    assert profiles.host_class(b"LOCALHOST:8000") == "local"
+    assert profiles.host_class(b"[::1]:8000") == "public"
+    assert profiles.host_class(b"soc.example") == "public"
+    assert profiles.get("public", "default") is profiles.get("public", "default")
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.models.notification import NotificationChannel
+from app.services import notification_routing
+from app.services.notification_routing import Route, RoutingTable
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    rows = []
+    loads = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        FakeSession.loads += 1
+        return _Result(list(FakeSession.rows))
+
+
+def test_routes_are_cached_until_invalidated(monkeypatch):
+    monkeypatch.setattr(notification_routing, "SessionLocal", FakeSession)
+    FakeSession.loads = 0
+    FakeSession.rows = [
+        (1, "incident_created", NotificationChannel.email, "a@soc.local", None, None),
+        (2, "incident_created", NotificationChannel.webhook, "https://hooks.test/x", 60, None),
+    ]
+    table = RoutingTable(ttl=3600)
+
+    async def run():
+        first = await table.routes("incident_created")
+        assert await table.routes("ticket_created") == {}
+        assert FakeSession.loads == 1
+        assert first["email"] == (Route(1, "email", "a@soc.local"),)
+
+        FakeSession.rows.append((3, "incident_created", NotificationChannel.email, "b@soc.local", None, 300))
+        table.invalidate()
+        second = await table.routes("incident_created")
+        assert FakeSession.loads == 2
+        assert [r.target for r in second["email"]] == ["a@soc.local", "b@soc.local"]
+
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+import asyncio
+
+from app.services.notification_routing import Route
+from app.services.notify_throttle import NotificationThrottle
+
+
+def _throttle(sent, **kwargs):
+    async def send(route, message):
+        sent.append((route.target, message))
+
+    return NotificationThrottle(send, channel_rates={"telegram": 1000}, **kwargs)
+
+
+def test_over_limit_messages_are_coalesced():
+    sent = []
+    throttle = _throttle(sent, target_rate_per_minute=60 * 20, target_burst=1)
+    route = Route(1, "telegram", "chat-1")
+
+    async def run():
+        for i in range(3):
+            await throttle.submit(route, f"event {i}")
+        assert sent == [("chat-1", "event 0")]
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert len(sent) == 2
+    assert "2 events" in sent[1][1]
+    assert "event 1" in sent[1][1] and "event 2" in sent[1][1]
+
+
+def test_digest_collects_until_flush():
+    sent = []
+    throttle = _throttle(sent)
+    route = Route(1, "telegram", "chat-1", digest_window_seconds=300)
+
+    async def run():
+        deferred = [await throttle.submit(route, f"event {i}") for i in range(4)]
+        assert sent == []
+        # все сообщения окна ждут одну отправку
+        assert len({id(d.future) for d in deferred}) == 1
+        assert 0 < deferred[0].delay <= 300
+        await throttle.close()
+        assert deferred[0].future.done() and deferred[0].future.exception() is None
+
+    asyncio.run(run())
+    assert len(sent) == 1
+    assert "4 events" in sent[0][1]
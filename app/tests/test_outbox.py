@@ -0,0 +1,133 @@
+import asyncio
+
+from app.services.outbox import Deferred, OutboxDispatcher, OutboxRow
+
+
+class MemoryOutbox(OutboxDispatcher):
+    """Таблица outbox в памяти: строки id -> OutboxRow, всё сразу доступно."""
+
+    def __init__(self, delivery, **kwargs):
+        super().__init__(delivery, **kwargs)
+        self.rows: dict[int, OutboxRow] = {}
+        self.retried: list[int] = []
+        self._next_id = 1
+
+    def add(self, event, message, subscription_id=None, attempts=0):
+        self.rows[self._next_id] = OutboxRow(self._next_id, event, subscription_id, message, attempts)
+        self._next_id += 1
+
+    async def _claim(self, db):
+        claimed = [row._replace(attempts=row.attempts + 1) for row in self.rows.values()]
+        self.rows.update({row.id: row for row in claimed})
+        return claimed
+
+    async def _apply(self, db, outcome):
+        for row, sub_ids in outcome.fanned:
+            del self.rows[row.id]
+            for sub_id in sub_ids:
+                self.add(row.event, row.message, sub_id)
+        for row_id in outcome.done:
+            del self.rows[row_id]
+        self.retried += [row_id for row_id, _ in outcome.retry]
+        for row, _ in outcome.deferred:
+            self.rows[row.id] = row._replace(attempts=row.attempts - 1)
+
+
+class FlakyDelivery:
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.sent = []
+        self.dead = []
+
+    async def fan_out(self, event_name):
+        return [1, 2, 3]
+
+    async def deliver(self, subscription_id, message):
+        if subscription_id in self.failing:
+            raise ConnectionError("target down")
+        self.sent.append((subscription_id, message))
+
+    async def give_up(self, subscription_id, message, error):
+        self.dead.append((subscription_id, error))
+
+
+def test_failed_target_is_kept_and_retried_alone():
+    delivery = FlakyDelivery(failing={2})
+    outbox = MemoryOutbox(delivery, max_attempts=3)
+    outbox.add("incident_created", "hello")
+
+    async def run():
+        await outbox.drain_once()               # раскладка по подпискам
+        assert sorted(r.subscription_id for r in outbox.rows.values()) == [1, 2, 3]
+
+        await outbox.drain_once()               # 1 и 3 доставлены, 2 — ошибка
+        assert [r.subscription_id for r in outbox.rows.values()] == [2]
+        assert outbox.retried and delivery.dead == []
+
+        delivery.failing.clear()
+        await outbox.drain_once()               # повтор только для 2
+        assert outbox.rows == {}
+
+    asyncio.run(run())
+    assert sorted(delivery.sent) == [(1, "hello"), (2, "hello"), (3, "hello")]
+
+
+def test_target_is_dead_lettered_after_last_attempt():
+    delivery = FlakyDelivery(failing={7})
+    outbox = MemoryOutbox(delivery, max_attempts=2)
+    outbox.add("incident_created", "hello", subscription_id=7)
+
+    async def run():
+        await outbox.drain_once()
+        assert len(outbox.rows) == 1 and delivery.dead == []
+        await outbox.drain_once()
+
+    asyncio.run(run())
+    assert outbox.rows == {}
+    assert delivery.dead == [(7, "target down")]
+
+
+class HeldBackDelivery(FlakyDelivery):
+    """Как троттлинг: сообщение буферизуется, отправка — позже."""
+
+    def __init__(self):
+        super().__init__(failing=())
+        self.future = None
+
+    async def deliver(self, subscription_id, message):
+        if self.future is None:
+            self.future = asyncio.get_running_loop().create_future()
+        return Deferred(self.future, 60)
+
+
+def test_held_back_row_is_kept_until_sent():
+    delivery = HeldBackDelivery()
+    outbox = MemoryOutbox(delivery)
+    outbox.add("incident_created", "hello", subscription_id=1)
+
+    async def run():
+        await outbox.drain_once()
+        # буфер ещё не отправлен: строка остаётся (если процесс упадёт — доставится повторно)
+        assert list(outbox.rows) == [1]
+        assert outbox.rows[1].attempts == 0
+
+        delivery.future.set_result(None)
+        await asyncio.sleep(0.01)
+        assert outbox.rows == {}
+
+    asyncio.run(run())
+
+
+def test_failed_held_back_send_is_retried():
+    delivery = HeldBackDelivery()
+    outbox = MemoryOutbox(delivery)
+    outbox.add("incident_created", "hello", subscription_id=1)
+
+    async def run():
+        await outbox.drain_once()
+        delivery.future.set_exception(ConnectionError("target down"))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert list(outbox.rows) == [1]
+    assert outbox.retried == [1]
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from app.db.pagination import decode_cursor, encode_cursor, keyset_page, split_page
+from app.models.incident import Incident
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_bad_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_split_page_builds_next_cursor():
+    ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [SimpleNamespace(id=i, created_at=ts) for i in (5, 4, 3)]
+    page, cursor = split_page(rows, limit=2)
+    assert [r.id for r in page] == [5, 4]
+    assert decode_cursor(cursor) == (ts, 4)
+    assert split_page(rows, limit=3) == (rows, None)
+
+
+def test_keyset_page_sql():
+    cursor = encode_cursor(datetime(2026, 1, 1, tzinfo=timezone.utc), 10)
+    stmt = keyset_page(select(Incident), Incident.created_at, Incident.id, cursor, 20)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(incidents.created_at, incidents.id) <" in sql
+    assert "ORDER BY incidents.created_at DESC, incidents.id DESC" in sql
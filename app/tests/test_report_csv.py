@@ -0,0 +1,59 @@
+import asyncio
+from collections import namedtuple
+from datetime import date, datetime
+
+from app.reports.utils import fetch_incidents_by_date, generate_csv, stream_csv
+
+Row = namedtuple("Row", "id title status priority created_at")
+
+ROWS = [
+    Row(1, "plain", "open", "low", datetime(2026, 3, 1, 9, 5)),
+    Row(2, 'comma, "quotes"', "closed", "high", datetime(2026, 3, 1, 10, 0)),
+    Row(3, "multi\nline; инцидент", "open", "medium", datetime(2026, 3, 2, 23, 59)),
+]
+
+
+class StreamResult:
+    def __init__(self, rows, size):
+        self.rows = rows
+        self.size = size
+
+    async def partitions(self):
+        for i in range(0, len(self.rows), self.size):
+            yield self.rows[i:i + self.size]
+
+    def all(self):
+        return self.rows
+
+
+class CsvSession:
+    """Одни и те же строки для серверного курсора (stream) и для execute()."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def stream(self, stmt):
+        return StreamResult(self.rows, stmt.get_execution_options()["yield_per"])
+
+    async def execute(self, stmt):
+        return StreamResult(self.rows, len(self.rows))
+
+
+async def _both(rows, chunk_rows):
+    db = CsvSession(rows)
+    chunks = [chunk async for chunk in stream_csv(db, date(2026, 3, 1), date(2026, 3, 2), chunk_rows=chunk_rows)]
+    expected = generate_csv(await fetch_incidents_by_date(db, date(2026, 3, 1), date(2026, 3, 2)))
+    return chunks, expected
+
+
+def test_streamed_csv_matches_generate_csv():
+    chunks, expected = asyncio.run(_both(ROWS, chunk_rows=2))
+    assert len(chunks) == 2                   # по порции на партицию курсора
+    assert b"".join(chunks) == expected
+    assert expected.startswith(b"id,title,status,priority,created_at\r\n")
+    assert b'"comma, ""quotes"""' in expected
+
+
+def test_empty_range_is_header_only():
+    chunks, expected = asyncio.run(_both([], chunk_rows=2))
+    assert b"".join(chunks) == expected == b"id,title,status,priority,created_at\r\n"
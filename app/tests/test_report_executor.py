@@ -0,0 +1,86 @@
+import asyncio
+import glob
+import os
+import tempfile
+import time
+
+import pytest
+
+from app.reports import executor
+
+
+def _slow(seconds: float) -> bytes:
+    time.sleep(seconds)
+    return b"late"
+
+
+def _quick(value: bytes) -> bytes:
+    return value
+
+
+def _report_files():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), "report_*.bench")))
+
+
+def test_timeout_kills_worker_and_frees_slot(monkeypatch):
+    monkeypatch.setattr(executor, "REPORT_RENDER_TIMEOUT", 3.0)
+    monkeypatch.setattr(executor, "REPORT_RENDER_CONCURRENCY", 1)
+    monkeypatch.setattr(executor, "_slots", None)
+    monkeypatch.setattr(executor, "_pool", None)
+    before = _report_files()
+
+    async def run():
+        # первый вызов поднимает процессы (spawn) — прогреваем пул до замера таймаута
+        assert await executor.render(_quick, b"warm") == b"warm"
+        pool = executor._get_pool()
+        processes = list(pool._processes.values())
+
+        with pytest.raises(executor.ReportRenderTimeout):
+            await executor.render_to_file(_slow, 60, suffix=".bench")
+
+        # зависший процесс убит, единственный слот свободен для следующей задачи
+        await asyncio.sleep(0.5)
+        assert not any(p.is_alive() for p in processes)
+        assert executor._get_pool() is not pool
+        start = time.monotonic()
+        assert await executor.render(_quick, b"ok") == b"ok"
+        assert time.monotonic() - start < 3.0
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert _report_files() == before
+
+
+def test_timeout_does_not_kill_other_renders(monkeypatch):
+    monkeypatch.setattr(executor, "REPORT_RENDER_TIMEOUT", 3.0)
+    monkeypatch.setattr(executor, "REPORT_RENDER_WORKERS", 2)
+    monkeypatch.setattr(executor, "REPORT_RENDER_CONCURRENCY", 2)
+    monkeypatch.setattr(executor, "_slots", None)
+    monkeypatch.setattr(executor, "_pool", None)
+
+    async def run():
+        # оба процесса пула подняты заранее
+        await asyncio.gather(executor.render(_slow, 0.5), executor.render(_slow, 0.5))
+        pool = executor._get_pool()
+        processes = list(pool._processes.values())
+
+        hung = asyncio.create_task(executor.render(_slow, 60))
+        await asyncio.sleep(1.5)
+        # стартует до таймаута соседа и заканчивается после него
+        healthy = asyncio.create_task(executor.render(_slow, 2.5))
+
+        with pytest.raises(executor.ReportRenderTimeout):
+            await hung
+        assert all(p.is_alive() for p in processes)    # пул ждёт живую задачу
+        assert await healthy == b"late"
+
+        await asyncio.sleep(0.5)
+        assert not any(p.is_alive() for p in processes)
+        assert executor._get_pool() is not pool
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Delete
+
+from app.services import retention
+from app.services.blob_store import LocalBlobStore
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class ReportSession:
+    """DELETE ... RETURNING отдаёт заранее заданные пачки, SELECT — ещё используемые ключи."""
+
+    def __init__(self, batches, still_used):
+        self.batches = list(batches)
+        self.still_used = still_used
+        self.deletes = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        if isinstance(stmt, Delete):
+            self.deletes.append(_sql(stmt))
+            return Result(self.batches.pop(0) if self.batches else [])
+        return Result(self.still_used)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_sweep_reports_keeps_referenced_blobs(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    a, b, c = (asyncio.run(store.put(data)) for data in (b"a" * 10, b"b" * 20, b"c" * 5))
+    monkeypatch.setattr(retention, "get_blob_store", lambda: store)
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE", 0)
+
+    # вторая пачка неполная — на ней проход заканчивается; у c есть legacy-байты в строке
+    db = ReportSession(batches=[[(a, 10, 0), (b, 20, 0)], [(c, 5, 100)]], still_used=[b])
+    stats = asyncio.run(retention.sweep_reports(db, retention_days=30, batch_size=2))
+
+    assert stats.reports_deleted == 3
+    assert stats.blobs_deleted == 2
+    assert stats.bytes_reclaimed == 10 + 5 + 100
+    assert not asyncio.run(store.exists(a)) and not asyncio.run(store.exists(c))
+    assert asyncio.run(store.exists(b))           # на blob ещё ссылается другая строка
+
+    assert len(db.deletes) == 2
+    assert "LIMIT 2 FOR UPDATE SKIP LOCKED" in db.deletes[0]
+    assert db.commits == 4                         # каждая пачка — своя транзакция
+
+
+def test_sweep_reports_stops_on_empty_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "get_blob_store", lambda: LocalBlobStore(str(tmp_path)))
+    db = ReportSession(batches=[], still_used=[])
+    stats = asyncio.run(retention.sweep_reports(db, batch_size=2))
+    assert stats.reports_deleted == 0 and len(db.deletes) == 1 and db.commits == 1
+
+
+class AttachmentSession:
+    def __init__(self, message_names, attachment_paths):
+        self.message_names = message_names
+        self.attachment_paths = attachment_paths
+        self.commits = 0
+
+    async def execute(self, stmt):
+        if "messages.attachment" in _sql(stmt):
+            return Result(self.message_names)
+        return Result(self.attachment_paths)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_orphan_sweep_respects_references_and_grace(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE", 0)
+    old = time.time() - 2 * 3600
+    for name in ("orphan.bin", "in_message.png", "in_attachments.pdf", "fresh.bin"):
+        (tmp_path / name).write_bytes(b"x" * 7)
+        if name != "fresh.bin":
+            os.utime(tmp_path / name, (old, old))
+
+    db = AttachmentSession(
+        message_names=["in_message.png"],
+        attachment_paths=[os.path.join(os.path.abspath(tmp_path), "in_attachments.pdf")],
+    )
+    stats = asyncio.run(retention.sweep_orphan_attachments(db, directory=str(tmp_path), batch_size=2, grace=3600))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fresh.bin", "in_attachments.pdf", "in_message.png"]
+    assert stats.files_deleted == 1 and stats.bytes_reclaimed == 7
+    assert db.commits == 2                         # три старых файла — две пачки
@@ -0,0 +1,119 @@
+import asyncio
+import operator
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.slametrics import CLOSED_STATUSES, sla_metrics
+
+T0 = datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def _inc(created, response=None, resolution=None, status="open"):
+    return SimpleNamespace(
+        created_at=created,
+        first_response_at=created + timedelta(minutes=response) if response is not None else None,
+        closed_at=created + timedelta(minutes=resolution) if resolution is not None else None,
+        status=status,
+    )
+
+
+INCIDENTS = [
+    _inc(T0, response=30, resolution=120, status="closed"),
+    _inc(T0, response=60),
+    _inc(T0),
+    _inc(T0 + timedelta(days=1), response=10, resolution=30, status="Закрыт"),
+]
+
+
+def _percentile(values, p):
+    """percentile_cont: линейная интерполяция, NULL не участвуют."""
+    if not values:
+        return None
+    values = sorted(values)
+    pos = p * (len(values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def _avg(values):
+    return sum(values) / len(values) if values else None
+
+
+class AggregateSession:
+    """Считает агрегат sla_metrics по INCIDENTS так же, как Postgres.
+
+    Границы created_at берутся из WHERE запроса; SQL запоминается для проверки формы.
+    """
+
+    def __init__(self):
+        self.sql = None
+
+    async def execute(self, stmt):
+        self.sql = str(stmt.compile(dialect=postgresql.dialect()))
+        rows = INCIDENTS
+        for criterion in stmt._where_criteria:
+            assert criterion.operator in (operator.ge, operator.le)
+            rows = [r for r in rows if criterion.operator(r.created_at, criterion.right.value)]
+
+        response = [(r.first_response_at - r.created_at).total_seconds() / 60 for r in rows if r.first_response_at]
+        resolution = [(r.closed_at - r.created_at).total_seconds() / 60 for r in rows if r.closed_at]
+        row = SimpleNamespace(
+            total=len(rows),
+            closed=sum(r.status in CLOSED_STATUSES for r in rows),
+            avg_response=_avg(response),
+            avg_resolution=_avg(resolution),
+            p50_response=_percentile(response, 0.5),
+            p90_response=_percentile(response, 0.9),
+            p50_resolution=_percentile(resolution, 0.5),
+            p90_resolution=_percentile(resolution, 0.9),
+        )
+        return SimpleNamespace(one=lambda: row)
+
+
+def _metrics(start=None, end=None):
+    db = AggregateSession()
+    return asyncio.run(sla_metrics(start=start, end=end, db=db)), db.sql
+
+
+def test_whole_period_in_one_aggregate():
+    metrics, sql = _metrics()
+    assert "count(*) FILTER (WHERE incidents.status IN" in sql
+    assert sql.count("WITHIN GROUP (ORDER BY") == 4
+    assert "WHERE" not in sql.split("FROM incidents", 1)[1]
+
+    assert metrics == {
+        "avg_response_minutes": pytest.approx(33.33),
+        "avg_resolution_minutes": 75.0,
+        "p50_response_minutes": 30.0,
+        "p90_response_minutes": 54.0,
+        "p50_resolution_minutes": 75.0,
+        "p90_resolution_minutes": 111.0,
+        "total_closed": 2,
+        "total_open": 2,
+    }
+
+
+def test_start_end_window():
+    metrics, sql = _metrics(start=T0 + timedelta(hours=1), end=T0 + timedelta(days=2))
+    assert "incidents.created_at >=" in sql and "incidents.created_at <=" in sql
+    assert metrics["total_closed"] == 1 and metrics["total_open"] == 0
+    assert metrics["avg_response_minutes"] == metrics["p90_response_minutes"] == 10.0
+    assert metrics["avg_resolution_minutes"] == 30.0
+
+
+def test_empty_period_reports_zeros_for_null_aggregates():
+    metrics, _ = _metrics(start=T0 + timedelta(days=30))
+    assert metrics == {
+        "avg_response_minutes": 0,
+        "avg_resolution_minutes": 0,
+        "p50_response_minutes": 0,
+        "p90_response_minutes": 0,
+        "p50_resolution_minutes": 0,
+        "p90_resolution_minutes": 0,
+        "total_closed": 0,
+        "total_open": 0,
+    }
@@ -0,0 +1,80 @@
+import asyncio
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from app.services.smtp_pool import SMTPPool
+
+
+class FakeSMTP:
+    def __init__(self, pool):
+        self.pool = pool
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if self.pool.drop_next:
+            self.pool.drop_next = False
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+        self.pool.delivered.append(message["To"])
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+class FakePool(SMTPPool):
+    def __init__(self, **kwargs):
+        super().__init__(hostname="smtp.test", port=25, username="", **kwargs)
+        self.connects = 0
+        self.delivered = []
+        self.drop_next = False
+
+    async def _connect(self):
+        self.connects += 1
+        return FakeSMTP(self)
+
+
+def _message(to):
+    msg = EmailMessage()
+    msg["To"] = to
+    msg.set_content("hi")
+    return msg
+
+
+def test_sessions_are_reused():
+    pool = FakePool(size=1)
+
+    async def run():
+        for i in range(5):
+            await pool.send_message(_message(f"u{i}@soc.local"))
+
+    asyncio.run(run())
+    assert pool.connects == 1
+    assert len(pool.delivered) == 5
+
+
+def test_reconnects_after_server_drop():
+    pool = FakePool(size=1)
+
+    async def run():
+        await pool.send_message(_message("a@soc.local"))
+        pool.drop_next = True
+        await pool.send_message(_message("b@soc.local"))
+
+    asyncio.run(run())
+    assert pool.connects == 2
+    assert pool.delivered == ["a@soc.local", "b@soc.local"]
+
+
+def test_session_rotated_after_max_messages():
+    pool = FakePool(size=1, max_messages=2)
+
+    async def run():
+        for i in range(5):
+            await pool.send_message(_message(f"u{i}@soc.local"))
+
+    asyncio.run(run())
+    assert pool.connects == 3
@@ -0,0 +1,33 @@
+import time
+
+from app.security.keycloak import VerifiedTokenCache
+
+
+def test_cache_hit_until_exp():
+    """Cached claims are returned until the token expires."""
+    cache = VerifiedTokenCache(maxsize=10)
+    claims = {"sub": "u1", "exp": time.time() + 60}
+    cache.put("tok", claims)
+    assert cache.get("tok") is claims
+
+    cache.put("old", {"sub": "u2", "exp": time.time() - 1})
+    assert cache.get("old") is None
+
+
+def test_cache_is_bounded():
+    """Least recently used entries are evicted past maxsize."""
+    cache = VerifiedTokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_tokens_without_exp_are_not_cached():
+    cache = VerifiedTokenCache(maxsize=10)
+    cache.put("tok", {"sub": "u1"})
+    assert cache.get("tok") is None
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+from sqlalchemy import inspect
+
+from app.dependencies import auth
+from app.models.user import User
+from app.services.user_cache import UserIdentityCache
+
+
+def _user(role="analyst"):
+    return User(id=7, email="analyst@soc.local", username="analyst", role=role)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Snapshot is served until the TTL passes, then dropped."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = UserIdentityCache(ttl=60, maxsize=10)
+    cache.put(_user())
+
+    now[0] += 59
+    assert cache.get("analyst@soc.local") is not None
+    now[0] += 2
+    assert cache.get("analyst@soc.local") is None
+
+
+def test_each_get_returns_a_detached_copy():
+    cache = UserIdentityCache(ttl=60, maxsize=10)
+    cache.put(_user())
+
+    first = cache.get("analyst@soc.local")
+    second = cache.get("analyst@soc.local")
+    assert first is not second
+    assert inspect(first).detached and first.id == 7
+
+    first.role = "admin"  # изменения копии не попадают в кэш
+    assert cache.get("analyst@soc.local").role == "analyst"
+
+
+def test_invalidate_and_bounded_size():
+    cache = UserIdentityCache(ttl=60, maxsize=1)
+    cache.put(_user())
+    cache.invalidate("analyst@soc.local")
+    assert cache.get("analyst@soc.local") is None
+
+    cache.put(_user())
+    cache.put(User(id=8, email="other@soc.local", username="other", role="client"))
+    assert cache.get("analyst@soc.local") is None
+    assert cache.get("other@soc.local") is not None
+
+
+class CountingSession:
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.executed.append(stmt)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_role_is_written_only_when_keycloak_role_differs(monkeypatch):
+    cache = UserIdentityCache(ttl=60, maxsize=10)
+    monkeypatch.setattr(auth, "user_cache", cache)
+    cache.put(_user(role="analyst"))
+    claims = {"email": "analyst@soc.local", "realm_access": {"roles": ["analyst"]}}
+
+    db = CountingSession()
+    user = asyncio.run(auth._user_from_claims(claims, db))
+    assert user.role == "analyst"
+    assert db.executed == [] and db.commits == 0      # кэш-хит, роль та же — БД не трогаем
+
+    claims["realm_access"]["roles"] = ["manager"]
+    user = asyncio.run(auth._user_from_claims(claims, db))
+    assert user.role == "manager"
+    assert len(db.executed) == 1 and db.commits == 1  # один UPDATE роли
+    assert cache.get("analyst@soc.local").role == "manager"
+
+    asyncio.run(auth._user_from_claims(claims, db))
+    assert db.commits == 1
+
+
+class ApprovalSession:
+    def __init__(self, request, user):
+        self.rows = {"RoleRequest": request, "User": user}
+
+    async def get(self, model, key):
+        return self.rows[model.__name__]
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+def test_role_approval_drops_cached_user(monkeypatch):
+    from app.api import roles
+    from app.models.role_request import RoleRequest
+
+    cache = UserIdentityCache(ttl=60, maxsize=10)
+    monkeypatch.setattr(roles, "user_cache", cache)
+    assigned = []
+
+    async def assign(email, role):
+        assigned.append((email, role))
+
+    monkeypatch.setattr(roles, "assign_realm_role_to_email", assign)
+    cache.put(_user(role="client"))
+
+    request = RoleRequest(id=1, user_id=7, requested_role="analyst", status="pending")
+    asyncio.run(roles.approve_request(1, ApprovalSession(request, _user(role="client"))))
+
+    assert assigned == [("analyst@soc.local", "analyst")]
+    assert cache.get("analyst@soc.local") is None
@@ -17,9 +17,35 @@ export type IncidentPayload = {
   client_id?: number | null;
 };
 
-export async function fetchIncidents(): Promise<Incident[]> {
-  const { data } = await api.get("/api/incidents/my");
-  return data;
+export type IncidentQuery = {
+  limit?: number;
+  cursor?: string;
+  status?: string;
+  priority?: string;
+  created_from?: string;
+  created_to?: string;
+  with_total?: boolean;
+};
+
+export interface IncidentPage {
+  items: Incident[];
+  nextCursor: string | null;   // X-Next-Cursor, null на последней странице
+  total: number | null;        // X-Total-Count, только при with_total
+}
+
+// /api/incidents/my отдаёт страницу (по умолчанию 50 записей)
+export async function fetchIncidentPage(params?: IncidentQuery): Promise<IncidentPage> {
+  const { data, headers } = await api.get("/api/incidents/my", { params });
+  const total = headers["x-total-count"];
+  return {
+    items: data,
+    nextCursor: headers["x-next-cursor"] || null,
+    total: total != null ? Number(total) : null,
+  };
+}
+
+export async function fetchIncidents(params?: IncidentQuery): Promise<Incident[]> {
+  return (await fetchIncidentPage(params)).items;
 }
 
 export async function createIncident(payload: IncidentPayload) {
@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import {
+  fetchIncidentPage,
   fetchIncidents,
   fetchLatestNotifications,
   fetchNotificationSummary,
@@ -17,6 +18,7 @@ type Tab = "analytics" | "schedule" | "kpi";
 
 const Dashboard = () => {
   const [incidents, setIncidents] = useState<Incident[]>([]);
+  const [monthCounts, setMonthCounts] = useState({ openMonth: 0, closedMonth: 0, totalMonth: 0 });
   const [latestNotifications, setLatestNotifications] = useState<any[]>([]);
   const [notifSummary, setNotifSummary] = useState<NotifSummary>({
     email: true,
@@ -37,14 +39,22 @@ const Dashboard = () => {
     const load = async () => {
       try {
         setError("");
-        const [inc, slaM, notifSum, latest, threat] = await Promise.all([
-          fetchIncidents(),
+        // счётчики за месяц берём из X-Total-Count, а не перебором всего списка
+        const now = new Date();
+        const monthStart = new Date(now.getFullYear(), now.getMonth(), 1).toISOString();
+        const [inc, monthAll, monthOpen, slaM, notifSum, latest, threat] = await Promise.all([
+          fetchIncidents({ limit: 6 }),
+          fetchIncidentPage({ limit: 1, created_from: monthStart, with_total: true }),
+          fetchIncidentPage({ limit: 1, created_from: monthStart, status: "open", with_total: true }),
           fetchSlaMetrics(),
           fetchNotificationSummary(),
           fetchLatestNotifications(),
           fetchThreatLevel(30),
         ]);
         setIncidents(inc || []);
+        const totalMonth = monthAll.total ?? 0;
+        const openMonth = monthOpen.total ?? 0;
+        setMonthCounts({ openMonth, closedMonth: totalMonth - openMonth, totalMonth });
         setSla(slaM || null);
         setNotifSummary(notifSum || { email: false, telegram: false, webhook: false });
         setLatestNotifications(latest || []);
@@ -65,24 +75,7 @@ const Dashboard = () => {
     return t("dashboard.goodEvening");
   }, [t]);
 
-  const { openMonth, closedMonth, totalMonth } = useMemo(() => {
-    const now = new Date();
-    const y = now.getFullYear();
-    const m = now.getMonth();
-    const inMonth = (d: Date) => d.getFullYear() === y && d.getMonth() === m;
-
-    const open = incidents.filter(
-      (i) => i.status === "open" && inMonth(new Date(i.created_at))
-    ).length;
-
-    const closed = incidents.filter(
-      (i) => i.status !== "open" && inMonth(new Date(i.created_at))
-    ).length;
-
-    const total = incidents.filter((i) => inMonth(new Date(i.created_at))).length;
-
-    return { openMonth: open, closedMonth: closed, totalMonth: total };
-  }, [incidents]);
+  const { openMonth, closedMonth, totalMonth } = monthCounts;
 
   const activeChannels =
     (notifSummary.email ? 1 : 0) +
@@ -11,7 +11,7 @@ import {
   ToggleButton,
 } from "react-bootstrap";
 import { useAuth } from "../context/AuthContext";
-import { fetchIncidents, type Incident, createIncident } from "../api/api";
+import { fetchIncidentPage, type Incident, createIncident } from "../api/api";
 import { useTranslation } from "react-i18next";
 
 type Tab = "all" | "open" | "closed";
@@ -23,7 +23,9 @@ export default function Incidents() {
   const { t } = useTranslation();
 
   const [incidents, setIncidents] = useState<Incident[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string>("");
   const [q, setQ] = useState("");
   const [tab, setTab] = useState<Tab>(() => {
@@ -63,15 +65,20 @@ export default function Incidents() {
     }
   };
 
+  // список приходит страницами; статус фильтрует сервер, поиск — по загруженному
+  const statusParam = tab === "all" ? undefined : tab;
+
   const load = async () => {
     setLoading(true);
     setError("");
     try {
-      const data = await fetchIncidents();
-      setIncidents(Array.isArray(data) ? data : []);
+      const page = await fetchIncidentPage({ status: statusParam });
+      setIncidents(Array.isArray(page.items) ? page.items : []);
+      setNextCursor(page.nextCursor);
     } catch (e: any) {
       setError(e?.message || (t("common.loadError") as string));
       setIncidents([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
@@ -79,11 +86,24 @@ export default function Incidents() {
   useEffect(() => {
     load();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+  }, [tab]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchIncidentPage({ status: statusParam, cursor: nextCursor });
+      setIncidents((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e: any) {
+      setError(e?.message || (t("common.loadError") as string));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filtered = useMemo(() => {
     let rows = incidents;
-    if (tab !== "all") rows = rows.filter((i) => i.status === tab);
     if (q.trim()) {
       const s = q.trim().toLowerCase();
       rows = rows.filter(
@@ -93,7 +113,7 @@ export default function Incidents() {
       );
     }
     return rows;
-  }, [incidents, tab, q]);
+  }, [incidents, q]);
 
   return (
     <div className="container mt-4">
@@ -194,6 +214,15 @@ export default function Incidents() {
               )}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="text-center">
+              <Button variant="outline-secondary" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore
+                  ? t("common.loading")
+                  : t("incidents.loadMore", { defaultValue: "Load more" })}
+              </Button>
+            </div>
+          )}
         </div>
       )}
 
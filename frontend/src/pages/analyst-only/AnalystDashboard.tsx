@@ -19,7 +19,7 @@ export default function AnalystDashboard() {
     setError("");
     try {
       const [iRes, nRes] = await Promise.all([
-        fetch(`${BASE_URL}/api/incidents/my`, { credentials: "include" }),
+        fetch(`${BASE_URL}/api/incidents/my?limit=10`, { credentials: "include" }),
         fetch(`${BASE_URL}/api/notifications`, { credentials: "include" }),
       ]);
       if (!iRes.ok) throw new Error(`incidents: ${iRes.status}`);
@@ -18,7 +18,7 @@ export default function ManagerDashboard() {
     setLoading(true); setError("");
     try {
       const [iRes, aRes] = await Promise.all([
-        fetch(`${BASE_URL}/api/incidents/my`, { credentials: "include" }),
+        fetch(`${BASE_URL}/api/incidents/my?limit=8`, { credentials: "include" }),
         fetch(`${BASE_URL}/report/report/archive`, { credentials: "include" }),
       ]);
       if (!iRes.ok) throw new Error(`incidents: ${iRes.status}`);
@@ -0,0 +1,194 @@
+"""Microbenchmark of the auth path for GET /api/incidents/my.
+
+Runs the real FastAPI app in-process with a locally signed Keycloak token
+and an in-memory stand-in for the DB session, and reports per-request
+token verifications, claims lookups, DB statements, sessions and latency
+with cold and warm caches.
+
+Each mode is measured twice: through the current AuthContext path and
+through the previous get_current_user + require_roles pair (reproduced
+below as legacy_*), which looked the claims up in both dependencies and
+opened its own DB session for auth.
+
+    python scripts/bench_auth.py [-n 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.makedirs("attachments", exist_ok=True)
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.database import get_db
+from app.dependencies import auth
+from app.models.user import User
+from app.security import keycloak
+from app.services.user_cache import user_cache
+
+stats = {"verify": 0, "claims": 0, "execute": 0, "sessions": 0}
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Answers the user lookup with one analyst and the incident list with []."""
+
+    user = User(id=1, email="analyst@soc.local", username="analyst", role="analyst")
+
+    async def execute(self, stmt):
+        stats["execute"] += 1
+        entity = stmt.column_descriptions[0]["entity"]
+        return _Result([self.user] if entity is User else [])
+
+    async def commit(self):
+        pass
+
+
+async def fake_get_db():
+    stats["sessions"] += 1
+    yield FakeSession()
+
+
+async def legacy_get_db():
+    # the old app.dependencies.auth.get_db: a second session per request
+    stats["sessions"] += 1
+    yield FakeSession()
+
+
+async def legacy_get_current_user(
+    request: Request,
+    authorization=Depends(auth.bearer_scheme),
+    db=Depends(legacy_get_db),
+) -> User:
+    if authorization and authorization.lower().startswith("bearer "):
+        try:
+            claims = await auth.get_current_claims(request, authorization)
+            return await auth._user_from_claims(claims, db)
+        except HTTPException:
+            pass
+    return await auth._user_from_cookie(request, db)
+
+
+def legacy_require_roles(*allowed_roles):
+    allowed = {r.lower() for r in allowed_roles}
+
+    async def checker(
+        request: Request,
+        user: User = Depends(auth.get_current_user),   # overridden by legacy_get_current_user
+        authorization=Depends(auth.bearer_scheme),
+    ) -> User:
+        if (user.role or "").lower() == "admin":
+            return user
+        if authorization and authorization.lower().startswith("bearer "):
+            try:
+                claims = await auth.get_current_claims(request, authorization)
+                if auth._normalize_roles(keycloak.get_roles(claims)) & allowed:
+                    return user
+            except HTTPException:
+                pass
+        if (user.role or "").lower() in allowed:
+            return user
+        raise HTTPException(status_code=403)
+
+    return checker
+
+
+def _use_legacy_path():
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/incidents/my")
+    guard = route.dependencies[0].dependency
+    app.dependency_overrides[guard] = legacy_require_roles("client", "analyst", "manager")
+    app.dependency_overrides[auth.get_current_user] = legacy_get_current_user
+
+
+def _install_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keycloak.jwks_manager._keys = {"bench": key.public_key()}
+    keycloak.jwks_manager._expires_at = float("inf")
+    return jwt.encode(
+        {
+            "iss": keycloak._issuer(),
+            "exp": int(time.time()) + 3600,
+            "email": "analyst@soc.local",
+            "realm_access": {"roles": ["analyst"]},
+        },
+        key,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+
+
+def _run(client, headers, n, cold, path):
+    for k in stats:
+        stats[k] = 0
+    started = time.perf_counter()
+    for _ in range(n):
+        if cold:
+            keycloak._token_cache.clear()
+            user_cache.clear()
+        r = client.get("/api/incidents/my", headers=headers)
+        assert r.status_code == 200, r.text
+    elapsed = time.perf_counter() - started
+    label = f"{path}, {'cold' if cold else 'warm'} caches"
+    print(
+        f"{label:24} {elapsed / n * 1e6:8.1f} us/req  "
+        f"verify/req={stats['verify'] / n:.2f}  "
+        f"claims/req={stats['claims'] / n:.2f}  "
+        f"sql/req={stats['execute'] / n:.2f}  "
+        f"sessions/req={stats['sessions'] / n:.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    verify = keycloak._verify
+
+    async def counting_verify(token):
+        stats["verify"] += 1
+        return await verify(token)
+
+    keycloak._verify = counting_verify
+    claims_lookup = auth.get_current_claims
+
+    async def counting_claims(request, authorization):
+        stats["claims"] += 1
+        return await claims_lookup(request, authorization)
+
+    auth.get_current_claims = counting_claims
+    app.dependency_overrides[get_db] = fake_get_db
+    headers = {"Authorization": f"Bearer {_install_key()}"}
+
+    client = TestClient(app)
+    client.get("/api/incidents/my", headers=headers)  # warm-up
+    _run(client, headers, args.n, cold=True, path="context")
+    _run(client, headers, args.n, cold=False, path="context")
+
+    _use_legacy_path()
+    client.get("/api/incidents/my", headers=headers)
+    _run(client, headers, args.n, cold=True, path="legacy")
+    _run(client, headers, args.n, cold=False, path="legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Throughput of the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Builds two small apps with the same endpoints (a JSON GET, a JSON POST and a
+256 KB streamed GET) — one wrapped in the previous BaseHTTPMiddleware versions
+of SecurityHeaders/CSRF/Audit, the other in app.middleware — and drives them
+in-process through httpx.ASGITransport. The audit writer's DB write is
+replaced by a no-op so only the middleware cost is measured.
+
+    python scripts/bench_middleware.py [-n 3000] [-c 20]
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import hmac
+import os
+import secrets
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from app.core.config import settings as _settings
+from app.middleware.audit import AUDITED_METHODS, AuditMiddleware, _user_id
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.services.audit_writer import audit_writer
+
+CHUNK = b"x" * 16384
+CHUNKS = 16
+
+
+# --- previous implementation (app/main.py, app/middleware/audit.py) ---
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+        response.headers.setdefault("X-Content-Type-Options", "nosniff")
+        response.headers.setdefault("X-Frame-Options", "DENY")
+        response.headers.setdefault("Referrer-Policy", "strict-origin-when-cross-origin")
+        response.headers.setdefault("Permissions-Policy", "geolocation=(), microphone=(), camera=()")
+        path = request.url.path or ""
+        is_docs = path.startswith("/docs") or path.startswith("/redoc")
+        cdn = " https://cdn.jsdelivr.net" if is_docs else ""
+        if request.url.hostname in {"localhost", "127.0.0.1"}:
+            csp = (
+                "default-src 'self'; img-src 'self' data: blob: https:; "
+                f"style-src 'self' 'unsafe-inline'{cdn}; "
+                f"script-src 'self' 'unsafe-eval' 'unsafe-inline'{cdn}; "
+                "connect-src 'self' http://localhost:8000 http://127.0.0.1:8000 http://localhost:8080 http://127.0.0.1:8080 http://localhost:5173 ws://localhost:5173; "
+                "frame-ancestors 'none'"
+            )
+        else:
+            csp = (
+                "default-src 'self'; img-src 'self' data: https:; "
+                f"style-src 'self' 'unsafe-inline'{cdn}; script-src 'self'{cdn}; "
+                "connect-src 'self'; frame-ancestors 'none'"
+            )
+        response.headers.setdefault("Content-Security-Policy", csp)
+        return response
+
+
+class LegacyCSRF(BaseHTTPMiddleware):
+    def _sign(self, nonce: str) -> str:
+        sig = hmac.new(_settings.CSRF_SECRET.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+        return f"{nonce}.{sig}"
+
+    def _verify(self, value: str, presented: str) -> bool:
+        try:
+            nonce, sig = value.split(".", 1)
+        except ValueError:
+            return False
+        calc = hmac.new(_settings.CSRF_SECRET.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(sig, calc) and hmac.compare_digest(nonce, presented)
+
+    async def dispatch(self, request: Request, call_next):
+        csrf_cookie = request.cookies.get("csrf_token")
+        if request.method in ("GET", "HEAD", "OPTIONS") and not csrf_cookie:
+            response = await call_next(request)
+            response.set_cookie("csrf_token", self._sign(secrets.token_urlsafe(32)), path="/", max_age=86400)
+            return response
+        if request.method in ("POST", "PUT", "PATCH", "DELETE"):
+            auth = request.headers.get("Authorization", "")
+            if not auth.lower().startswith("bearer "):
+                presented = request.headers.get("X-CSRF-Token")
+                if not (csrf_cookie and presented and self._verify(csrf_cookie, presented)):
+                    return Response("CSRF token missing or invalid", status_code=403)
+        return await call_next(request)
+
+
+class LegacyAudit(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method in AUDITED_METHODS:
+            await audit_writer.submit({
+                "user_id": _user_id(request.scope),
+                "path": request.url.path,
+                "method": request.method,
+                "status_code": response.status_code,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc),
+                "user_agent": request.headers.get("user-agent"),
+                "ip": request.client.host if request.client else None,
+                "error": None,
+            })
+        return response
+
+
+def build(security, csrf, audit) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(security)
+    app.add_middleware(csrf)
+    app.add_middleware(audit)
+
+    @app.get("/json")
+    async def get_json():
+        return {"status": "ok", "items": list(range(20))}
+
+    @app.post("/json")
+    async def post_json():
+        return {"status": "created"}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for _ in range(CHUNKS):
+                yield CHUNK
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+async def run(app: FastAPI, method: str, path: str, n: int, concurrency: int, headers: dict):
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://soc.example") as client:
+        queue = list(range(n))
+
+        async def worker():
+            while queue:
+                queue.pop()
+                t0 = time.perf_counter()
+                r = await client.request(method, path, headers=headers)
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.status_code
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return n / elapsed, statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=3000)
+    parser.add_argument("-c", type=int, default=20)
+    args = parser.parse_args()
+
+    async def _noop_write(batch):
+        return None
+
+    audit_writer._write = _noop_write
+    await audit_writer.start()
+
+    csrf = CSRFMiddleware(None)
+    token = secrets.token_urlsafe(32)
+    cookie = f"csrf_token={csrf._sign(token)}"
+    cases = [
+        ("GET /json (no csrf cookie)", "GET", "/json", {}),
+        ("GET /json", "GET", "/json", {"cookie": cookie}),
+        ("POST /json (csrf + audit)", "POST", "/json", {"cookie": cookie, "X-CSRF-Token": token}),
+        ("GET /stream 256 KB", "GET", "/stream", {"cookie": cookie}),
+    ]
+    stacks = {
+        "BaseHTTPMiddleware": build(LegacySecurityHeaders, LegacyCSRF, LegacyAudit),
+        "pure ASGI": build(SecurityHeadersMiddleware, CSRFMiddleware, AuditMiddleware),
+    }
+
+    print(f"{'case':30} {'stack':20} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for title, method, path, headers in cases:
+        for name, app in stacks.items():
+            rps, p50, p99 = await run(app, method, path, args.n, args.c, headers)
+            print(f"{title:30} {name:20} {rps:9.0f} {p50:8.2f} {p99:8.2f}")
+
+    await audit_writer.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""Webhook delivery benchmark against a local mock webhook server.
+
+Starts a minimal keep-alive HTTP/1.1 server on localhost, then delivers N
+webhook notifications through NotificationService._send_webhook twice:
+with a fresh httpx.AsyncClient per message (the old behaviour) and with the
+pooled per-host clients from app/services/http_clients.py. Reports
+throughput, latency percentiles and how many TCP connections the server saw.
+
+    python scripts/bench_notify.py [-n 2000] [-c 50] [--delay-ms 2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+
+from app.services import notify
+from app.services.http_clients import HTTPClientPool
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 11\r\n\r\n{\"ok\":true}"
+
+
+class MockWebhookServer:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                self.requests += 1
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class _FreshClients:
+    """Old behaviour: a new client (and TCP connection) for every message."""
+
+    def get(self, url):
+        return _OneShot()
+
+
+class _OneShot:
+    async def post(self, url, **kwargs):
+        async with httpx.AsyncClient() as client:
+            return await client.post(url, **kwargs)
+
+
+async def run(label, clients, url, n, concurrency, server):
+    notify.http_clients = clients
+    service = notify.NotificationService()
+    server.connections = server.requests = 0
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with slots:
+            t0 = time.perf_counter()
+            await service._send_webhook(url, "bench")
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(
+        f"{label:>7}: {n / elapsed:8.0f} msg/s  "
+        f"p50 {statistics.median(latencies):6.2f} ms  p95 {p(0.95):6.2f} ms  p99 {p(0.99):6.2f} ms  "
+        f"connections {server.connections}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000)
+    parser.add_argument("-c", type=int, default=50, help="concurrent sends")
+    parser.add_argument("--delay-ms", type=float, default=2.0, help="server think time")
+    args = parser.parse_args()
+
+    server = MockWebhookServer(args.delay_ms / 1000)
+    srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/hook"
+
+    await run("fresh", _FreshClients(), url, args.n, args.c, server)
+    pool = HTTPClientPool(max_connections=args.c, max_keepalive=args.c)
+    await run("pooled", pool, url, args.n, args.c, server)
+    await pool.close()
+
+    srv.close()
+    await srv.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())